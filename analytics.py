@@ -0,0 +1,135 @@
+import numpy as np
+
+from reviews import HISTOGRAM_BINS, SCORE_COLS, TEACHER_COL, clean_name, to_score
+
+CRITERIA = list(SCORE_COLS)  # teaching, leniency, correction, da_quiz, overall
+OVERALL = CRITERIA.index("overall")
+PRIOR_WEIGHT = 5  # reviews' worth of pull towards the global mean
+
+
+def _to_float_array(values):
+    try:
+        return np.asarray(values, dtype=float)
+    except (TypeError, ValueError):
+        # Blank or non-numeric cells somewhere in the column
+        return np.array([to_score(value) for value in values], dtype=float)
+
+
+# Per-teacher rating statistics computed in one vectorized pass over all reviews.
+# Row i of every array belongs to keys[i] (the clean_name of the teacher).
+class RatingAnalytics:
+    def __init__(self, records, departments=None, prior_weight=PRIOR_WEIGHT):
+        self.departments = departments or {}
+        self.prior_weight = prior_weight
+        raw_names = [str(record.get(TEACHER_COL, '')).strip() for record in records]
+        # clean_name is a regex, so run it once per distinct spelling rather than per review
+        cleaned = {name: clean_name(name) for name in set(raw_names)}
+        scores = np.column_stack(
+            [_to_float_array([record.get(col, 0) for record in records]) for col in SCORE_COLS.values()]
+        ).reshape(len(records), len(CRITERIA))
+        self.position = {}
+        self.display_names = []
+        codes = []
+        for name in raw_names:
+            key = cleaned[name]
+            code = self.position.get(key)
+            if code is None:
+                code = self.position[key] = len(self.position)
+                self.display_names.append(name)
+            codes.append(code)
+        codes = np.array(codes, dtype=int)
+        self.keys = np.array(list(self.position), dtype=object)
+        self.key_departments = np.array([self.departments.get(key, "") for key in self.keys], dtype=object)
+        teachers = len(self.keys)
+        self.count = np.bincount(codes, minlength=teachers)
+        safe_count = np.maximum(self.count, 1)[:, None]
+
+        self.sum = np.stack([np.bincount(codes, weights=scores[:, c], minlength=teachers) for c in range(len(CRITERIA))], axis=1)
+        self.mean = self.sum / safe_count
+        sum_sq = np.stack([np.bincount(codes, weights=scores[:, c] ** 2, minlength=teachers) for c in range(len(CRITERIA))], axis=1)
+        self.variance = np.maximum(sum_sq / safe_count - self.mean ** 2, 0.0)
+
+        # Medians: sort each criterion by (teacher, value) and pick the middle of every group
+        starts = np.concatenate(([0], np.cumsum(self.count)[:-1])) if teachers else np.array([], dtype=int)
+        lower = starts + (self.count - 1) // 2
+        upper = starts + self.count // 2
+        self.median = np.zeros((teachers, len(CRITERIA)))
+        for c in range(len(CRITERIA)):
+            ordered = scores[np.lexsort((scores[:, c], codes)), c]
+            if teachers:
+                self.median[:, c] = (ordered[lower] + ordered[upper]) / 2
+
+        bins = np.clip(np.rint(scores), 0, HISTOGRAM_BINS - 1).astype(int)
+        self.histogram = np.stack(
+            [np.bincount(codes * HISTOGRAM_BINS + bins[:, c], minlength=teachers * HISTOGRAM_BINS).reshape(teachers, HISTOGRAM_BINS)
+             for c in range(len(CRITERIA))],
+            axis=1,
+        )  # teachers x criteria x bins
+
+        # Bayesian average: every teacher starts with prior_weight reviews at the global mean
+        self.global_mean = scores.mean(axis=0) if len(records) else np.full(len(CRITERIA), 5.0)
+        self.smoothed = np.minimum(
+            (self.sum + prior_weight * self.global_mean) / (self.count[:, None] + prior_weight), 10
+        )
+
+    def __len__(self):
+        return len(self.keys)
+
+    def smoothed_score(self, teacher_name, criterion="overall"):
+        i = self.position.get(clean_name(teacher_name))
+        c = CRITERIA.index(criterion)
+        if i is None:
+            return float(min(self.global_mean[c], 10))
+        return float(self.smoothed[i, c])
+
+    def teacher(self, teacher_name):
+        i = self.position.get(clean_name(teacher_name))
+        if i is None:
+            return None
+        return {
+            "count": int(self.count[i]),
+            "mean": dict(zip(CRITERIA, self.mean[i].tolist())),
+            "median": dict(zip(CRITERIA, self.median[i].tolist())),
+            "variance": dict(zip(CRITERIA, self.variance[i].tolist())),
+            "smoothed": dict(zip(CRITERIA, self.smoothed[i].tolist())),
+            "histogram": dict(zip(CRITERIA, self.histogram[i].tolist())),
+        }
+
+    def leaderboard(self, criterion="overall", best=True, min_reviews=1, department=None, limit=50):
+        # Teachers ranked by their smoothed score for criterion
+        c = CRITERIA.index(criterion)
+        mask = self.count >= min_reviews
+        if department:
+            mask &= self.key_departments == department
+        rows = np.nonzero(mask)[0]
+        order = np.argsort(self.smoothed[rows, c], kind="stable")
+        if best:
+            order = order[::-1]
+        rows = rows[order[:limit]]
+        return [
+            {
+                "teacher": self.display_names[i],
+                "department": self.key_departments[i],
+                "reviews": int(self.count[i]),
+                "score": round(float(self.smoothed[i, c]), 2),
+                "mean": round(float(self.mean[i, c]), 2),
+                "median": round(float(self.median[i, c]), 2),
+                "std_dev": round(float(np.sqrt(self.variance[i, c])), 2),
+            }
+            for i in rows
+        ]
+
+    def department_summary(self):
+        # Review-weighted overall mean and teacher count per department
+        if not len(self.keys):
+            return []
+        labels = np.where(self.key_departments == "", "Unknown", self.key_departments).astype(str)
+        departments, codes = np.unique(labels, return_inverse=True)
+        teachers = np.bincount(codes, minlength=len(departments))
+        reviews = np.bincount(codes, weights=self.count, minlength=len(departments))
+        totals = np.bincount(codes, weights=self.sum[:, OVERALL], minlength=len(departments))
+        means = np.divide(totals, reviews, out=np.zeros_like(totals), where=reviews > 0)
+        return [
+            {"department": str(department), "teachers": int(t), "reviews": int(r), "mean_overall": round(float(m), 2)}
+            for department, t, r, m in zip(departments, teachers, reviews, means)
+        ]
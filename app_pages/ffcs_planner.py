@@ -0,0 +1,292 @@
+import time
+
+import streamlit as st
+
+from app_resources import get_offerings, get_pdf_renderer, get_plan_store, get_review_analytics
+from metrics import Sections
+from pdf_export import export_zip
+from planner import Plan, diff_plans
+from solver import parse_options, top_timetables
+from timetable import clash_engine, parse_slots, describe_problems, render_timetable_html
+
+sections = Sections("timetable")
+sections.mark("state")
+
+# --- State ---
+def plan_from_link():
+    # Timetable named by the page URL: ?id=<saved id> or ?t=<token>
+    try:
+        if st.query_params.get("id"):
+            return get_plan_store().load(st.query_params["id"])
+        if st.query_params.get("t"):
+            return Plan.decode(st.query_params["t"])
+    except ValueError:
+        st.warning("The timetable in this link could not be loaded.")
+    return None
+
+def get_state():
+    if "plan" not in st.session_state:
+        # Courses plus slot bitmasks; the timetable cells, faculty list and
+        # occupied slots are all views of it
+        st.session_state["plan"] = plan_from_link() or Plan()
+    # Add form state for clearing
+    for key in ["course_code", "course_name", "faculty", "slot_str", "room"]:
+        if key not in st.session_state or st.session_state[key] is None:
+            st.session_state[key] = ""
+    return st.session_state
+state = get_state()
+
+# --- UI Styling ---
+st.markdown("""
+    <style>
+    .ffcs-table {border-collapse: collapse; width: 100%; background: #181e29; color: #fff;}
+    .ffcs-table th, .ffcs-table td {border: 1px solid #232b3b; text-align: center; font-weight: bold;}
+    .ffcs-table th {background: #232b3b; color: #7ecfff;}
+    .ffcs-table .lunch {background: #232b3b; color: #ffb347;}
+    .ffcs-table .green {background: #2ecc40 !important; color: #fff;}
+    .ffcs-table .red {background: #e74c3c !important; color: #fff;}
+    .ffcs-table .empty {background: #181e29;}
+    .ffcs-table .period-label {background: #232b3b; color: #fff; font-weight: bold;}
+    .ffcs-table .theory-time {background: #bfcafc; color: #222; font-weight: bold;}
+    .ffcs-table .lab-time {background: #b3e0fc; color: #222; font-weight: bold;}
+    .ffcs-table td, .ffcs-table th {width: 110px; height: 60px; min-width: 110px; min-height: 60px; max-width: 110px; max-height: 60px; overflow: hidden;}
+    </style>
+""", unsafe_allow_html=True)
+
+st.title("FFCS Faculty Timetable")
+st.write("Add faculty directly to the timetable. No course management. No clashes allowed.")
+
+def add_to_timetable(entry):
+    # Caller has already checked the slots for clashes
+    state["plan"].add(entry)
+
+sections.mark("offerings")
+
+# --- Course Offerings ---
+def available_offerings(offerings):
+    # Offerings that still fit around the timetable. Kept between reruns and
+    # narrowed by only the courses added since; a loaded timetable (a new plan
+    # object) or a reloaded offerings file starts over from the full set.
+    plan = state["plan"]
+    source, owner, applied, available = state.get("offerings_available", (None, None, 0, 0))
+    if source is not offerings or owner is not plan or applied > len(plan):
+        applied, available = 0, offerings.all
+    available = offerings.narrow(available, plan.rows[applied:])
+    state["offerings_available"] = (offerings, plan, len(plan), available)
+    return available
+
+offerings = get_offerings()
+if offerings is not None:
+    st.subheader("Pick from Course Offerings")
+    available = available_offerings(offerings)
+    open_courses = offerings.courses(available)
+    if not open_courses:
+        st.caption("No offered course fits around your current timetable.")
+    else:
+        offer_course = st.selectbox(
+            "Course", open_courses, key="offer_course",
+            format_func=lambda code: f"{code} - {offerings.rows[offerings.for_course(code)[0]]['course_name']}",
+        )
+        offer_analytics = get_review_analytics()
+
+        def offering_label(i):
+            # Offerings whose faculty is in the catalog show that teacher's reviews
+            row = offerings.rows[i]
+            label = f"{row['faculty']} | {row['slots']} | {row['room']}"
+            if offerings.teacher_ids[i] is None:
+                return label
+            stats = offer_analytics.teacher(row["faculty"])
+            if stats is None:
+                return f"{label} | no reviews yet"
+            return f"{label} | {stats['smoothed']['overall']:.1f}/10 ({stats['count']} review{'s' if stats['count'] != 1 else ''})"
+
+        offer_id = st.selectbox(
+            "Faculty | Slot(s) | Room | Rating", offerings.for_course(offer_course, available), key="offer_id",
+            format_func=offering_label,
+        )
+        st.caption(f"{available.bit_count()} of {len(offerings)} offerings fit around your timetable.")
+        if st.button("Add offering"):
+            add_to_timetable(offerings.rows[offer_id])
+            st.rerun()
+
+sections.mark("add_faculty")
+
+# --- Faculty Input Form ---
+st.subheader("Add Faculty")
+with st.form("add_faculty_form"):
+    course_code = st.text_input("Course Code", value=state["course_code"], key="course_code")
+    course_name = st.text_input("Course Name", value=state["course_name"], key="course_name")
+    faculty = st.text_input("Faculty Name", value=state["faculty"], key="faculty")
+    slot_str = st.text_input("Slot(s) (e.g. A1+A2+B1)", value=state["slot_str"], key="slot_str")
+    room = st.text_input("Room Number", value=state["room"], key="room")
+    submitted = st.form_submit_button("Add to Timetable")
+    if submitted:
+        # Only slot_str is compulsory
+        if not slot_str.strip():
+            st.error("Slot(s) is a required field.")
+        else:
+            slots = parse_slots(slot_str)
+            problems = clash_engine.check(slots, state["plan"].slot_state)
+            if not problems:
+                add_to_timetable({
+                    "course_code": course_code,
+                    "course_name": course_name,
+                    "faculty": faculty,
+                    "slots": slot_str,
+                    "room": room
+                })
+            else:
+                st.error("\n\n".join(describe_problems(problems)))
+
+sections.mark("generator")
+
+# --- Timetable Generator ---
+st.subheader("Timetable Generator")
+st.write("List every option you would take, one per line, and get the best clash-free combinations around your current timetable, ranked by faculty reviews.")
+with st.form("solver_form"):
+    options_text = st.text_area(
+        "Options (Course Code | Faculty Name | Slot(s) | Room)",
+        key="solver_options",
+        placeholder="CSE1001 | Dr. Karthikeyan K | A1+TA1 | SJT101\nCSE1001 | Dr. Indhira K | A2+TA2 | SJT102",
+    )
+    top_n = st.number_input("Timetables to show", min_value=1, max_value=50, value=5, key="solver_top_n")
+    generate = st.form_submit_button("Generate Timetables")
+    if generate:
+        solver_courses = parse_options(options_text)
+        if not solver_courses:
+            st.error("Add at least one option in the form Course | Faculty | Slot(s).")
+        else:
+            solver_analytics = get_review_analytics()
+
+            def option_score(option):
+                return solver_analytics.smoothed_score(option["faculty"])
+
+            progress_text = st.empty()
+            last_update = [0.0]
+
+            def show_progress(found, best_total):
+                if time.monotonic() - last_update[0] > 0.2:
+                    last_update[0] = time.monotonic()
+                    progress_text.caption(f"Searching... {found} clash-free timetables so far (best score {best_total:.2f})")
+
+            state["solver_results"] = top_timetables(
+                solver_courses, int(top_n), option_score, base=state["plan"].slot_state, progress=show_progress
+            )
+            progress_text.empty()
+            if not state["solver_results"]:
+                st.error("No clash-free timetable exists for these options.")
+
+for rank, (total, picks) in enumerate(state.get("solver_results", [])):
+    with st.expander(f"Option {rank + 1}: score {total:.2f}", expanded=rank == 0):
+        st.dataframe(picks)
+        if st.button("Add these courses to my timetable", key=f"apply_solution_{rank}"):
+            if any(clash_engine.check(parse_slots(pick["slots"]), state["plan"].slot_state) for pick in picks):
+                st.error("Your timetable changed since this was generated; generate again.")
+            else:
+                for pick in picks:
+                    add_to_timetable({
+                        "course_code": pick["course_code"],
+                        "course_name": pick.get("course_name", ""),
+                        "faculty": pick["faculty"],
+                        "slots": pick["slots"],
+                        "room": pick["room"]
+                    })
+                state["solver_results"] = []
+                st.rerun()
+
+sections.mark("preview")
+
+# --- Timetable Preview ---
+def render_timetable():
+    return render_timetable_html(state["plan"].timetable, state["plan"].cell_is_lab)
+
+with st.expander("Timetable Preview", expanded=True):
+    st.markdown(render_timetable(), unsafe_allow_html=True)
+
+# --- Faculty List ---
+st.subheader("Faculty List")
+st.dataframe(state["plan"].faculty_list)
+
+sections.mark("share")
+
+# --- Save & Share ---
+# The page URL always carries the current timetable, so a refresh keeps it
+plan_token = state["plan"].encode() if len(state["plan"]) else ""
+if st.query_params.get("t", "") != plan_token or "id" in st.query_params:
+    st.query_params.clear()
+    if plan_token:
+        st.query_params["t"] = plan_token
+
+with st.expander("Save & Share Timetable"):
+    if st.button("Save timetable", disabled=not len(state["plan"])):
+        saved_id = get_plan_store().save(state["plan"])
+        st.success(f"Saved as {saved_id}. Open this page with ?id={saved_id} to load it.")
+    st.caption("Or share the current page URL, which holds the whole timetable.")
+    with st.form("load_plan_form"):
+        plan_ref = st.text_input("Saved timetable ID or token", key="plan_ref")
+        if st.form_submit_button("Load Timetable") and plan_ref.strip():
+            try:
+                loaded = get_plan_store().load(plan_ref) or Plan.decode(plan_ref.strip())
+            except ValueError:
+                loaded = None
+            if loaded is None:
+                st.error("No saved timetable with that ID, and it is not a valid token.")
+            else:
+                added, removed = diff_plans(state["plan"], loaded)
+                state["plan"] = loaded
+                state["solver_results"] = []
+                state["plan_loaded"] = f"Loaded timetable: {len(added)} courses added, {len(removed)} removed."
+                st.rerun()
+    if state.get("plan_loaded"):
+        st.info(state.pop("plan_loaded"))
+
+sections.mark("export")
+
+# --- Export as PDF ---
+def export_pdf():
+    return get_pdf_renderer().render(state["plan"].timetable, state["plan"].cell_is_lab, state["plan"].faculty_list)
+
+def solution_export_items():
+    # One printable timetable per generated option, each on top of the current timetable
+    items = []
+    for rank, (total, picks) in enumerate(state.get("solver_results", [])):
+        timetable, cell_is_lab = dict(state["plan"].timetable), dict(state["plan"].cell_is_lab)
+        for pick in picks:
+            for cell, is_lab in clash_engine.cell_kinds(parse_slots(pick["slots"])).items():
+                timetable[cell] = pick
+                cell_is_lab[cell] = is_lab
+        items.append({
+            "timetable": timetable,
+            "cell_is_lab": cell_is_lab,
+            "faculty_list": state["plan"].faculty_list + picks,
+            "title": f"FFCS Timetable - Option {rank + 1} (score {total:.2f})",
+        })
+    return items
+
+if st.button("Export as PDF"):
+    pdf_bytes = export_pdf()
+    st.download_button(
+        label="Download PDF",
+        data=pdf_bytes,
+        file_name="ffcs_faculty_timetable.pdf",
+        mime="application/pdf"
+    )
+
+if state.get("solver_results"):
+    export_all, export_zip_col = st.columns(2)
+    if export_all.button("Export all options as one PDF"):
+        export_all.download_button(
+            label="Download options PDF",
+            data=get_pdf_renderer().render_many(solution_export_items()),
+            file_name="ffcs_timetable_options.pdf",
+            mime="application/pdf"
+        )
+    if export_zip_col.button("Export options as ZIP"):
+        export_zip_col.download_button(
+            label="Download options ZIP",
+            data=export_zip(solution_export_items(), get_pdf_renderer()),
+            file_name="ffcs_timetable_options.zip",
+            mime="application/zip"
+        )
+
+sections.done()
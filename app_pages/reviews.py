@@ -0,0 +1,205 @@
+import math
+import time
+import uuid
+
+import streamlit as st
+
+from analytics import CRITERIA
+from app_resources import (
+    CATALOG_SOURCE, file_signature, get_all_reviews, get_catalog, get_image_cache,
+    get_review_analytics, get_review_store, get_search_index, get_submission_guard, get_teacher_card,
+)
+from metrics import Sections
+from submission_guard import ACCEPTED, DUPLICATE
+
+
+def calculate_overall_rating(reviews):
+    if reviews:
+        return sum(reviews) / len(reviews)
+    return 0
+
+
+SEARCH_LIMIT = 200
+PAGE_SIZES = [5, 10, 20, 50]
+BROWSER_COOKIE = "_streamlit_xsrf"  # set once per browser by Streamlit's XSRF protection
+
+
+def browser_id():
+    # Lasts as long as the browser keeps Streamlit's cookie; without it, one id per session
+    cookie = st.context.cookies.get(BROWSER_COOKIE)
+    if isinstance(cookie, str) and cookie:
+        return cookie
+    return st.session_state.setdefault("browser_id", uuid.uuid4().hex)
+
+
+sections = Sections("reviews")
+sections.mark("search")
+catalog = get_catalog(file_signature(CATALOG_SOURCE))
+teachers = catalog.teachers()
+search_index = get_search_index(catalog.source_hash)
+
+
+st.title("VIT Vellore Teacher Review")
+st.header("Search for a Teacher")
+
+search_query = st.text_input("Search for a teacher:")
+
+if search_query:
+    # One past the limit, to tell a full page of results from a truncated one
+    matches = [(catalog.ids[i], teachers[i]) for i, _ in search_index.search(search_query, limit=SEARCH_LIMIT + 1)]
+else:
+    matches = []
+truncated = len(matches) > SEARCH_LIMIT
+matches = matches[:SEARCH_LIMIT]
+
+# Start from the first page whenever the query changes
+if st.session_state.get("results_query") != search_query:
+    st.session_state["results_query"] = search_query
+    st.session_state["results_page"] = 1
+
+sections.mark("results")
+if matches:
+    st.write(f"Teachers found: {len(matches)}{'+' if truncated else ''}")
+    page_size = st.selectbox("Results per page", PAGE_SIZES, key="page_size")
+    num_pages = (len(matches) + page_size - 1) // page_size
+    st.session_state["results_page"] = min(st.session_state.get("results_page", 1), num_pages)
+    if num_pages > 1:
+        page = st.number_input(f"Page (of {num_pages})", min_value=1, max_value=num_pages, step=1, key="results_page")
+    else:
+        page = 1
+    page_matches = matches[(page - 1) * page_size:page * page_size]
+
+    # Widget keys use the stable catalog id so inputs stay with their teacher across pages and queries
+    for idx, (teacher, image_url) in page_matches:
+        col1, col2 = st.columns([2, 1])
+
+        with col1:
+            st.subheader(f"Teacher: {teacher}")
+
+            # Shared across sessions and rebuilt only when this teacher's reviews change
+            card = get_teacher_card(idx, teacher)
+
+            if card["count"]:
+                num_reviews = card["count"]
+                st.write(card["rating"])
+                st.caption(f"Adjusted for number of reviews: {get_review_analytics().smoothed_score(teacher):.2f} / 10")
+
+                # Expander bodies are always rendered, so the review list is only sent once asked for
+                with st.expander(f"Reviews ({num_reviews})"):
+                    if st.toggle("Load reviews", key=f"show_reviews_{idx}"):
+                        st.markdown(card["reviews"])
+            else:
+                st.write("No reviews submitted yet for this teacher.")
+
+            st.markdown("### **Rate the Teacher**")
+            teaching = st.slider("Teaching", 0, 10, key=f"teaching_{idx}")
+            leniency = st.slider("Leniency", 0, 10, key=f"leniency_{idx}")
+            correction = st.slider("Correction", 0, 10, key=f"correction_{idx}")
+            da_quiz = st.slider("DA/Quiz", 0, 10, key=f"da_quiz_{idx}")
+
+            overall_rating_input = calculate_overall_rating([teaching, leniency, correction, da_quiz])
+            st.write(f"**Overall Rating**: {overall_rating_input:.2f} / 10")
+
+            # Comment section with live character count
+            max_comment_length = 100
+            comment = st.text_area(
+                "Leave a comment (optional, max 100 characters):",
+                key=f"comment_{idx}",
+                max_chars=max_comment_length,
+                placeholder="Type your comment here..."
+            )
+            comment_length = len(comment)
+            st.write(f"{comment_length}/{max_comment_length} characters")
+
+            with col2:
+                try:
+                    # Never fetch on the script thread: until the thumbnail is
+                    # cached, the browser loads the original image
+                    image_cache = get_image_cache()
+                    thumbnail = image_cache.cached(image_url)
+                    if thumbnail is None:
+                        image_cache.warm(image_url)
+                    st.image(thumbnail or image_url, caption=f"{teacher}", width=150)
+                except Exception as e:
+                    st.error(f"Error displaying image: {e}")
+
+            submit_button = st.button(f"Submit Review for {teacher}", key=f"submit_{idx}")
+
+            review_id = st.session_state.get('submission_ids', {}).get(teacher)
+            if review_id is not None and not submit_button:
+                sync_status = get_review_store()[1].status(review_id) or "saved locally"
+                st.caption(f"Your review sync status: {sync_status}")
+
+            if submit_button:
+                guard = get_submission_guard()
+                client = guard.fingerprint(st.context.headers, st.context.ip_address, browser_id())
+                browser = guard.browser(browser_id())
+                verdict = guard.admit(client, browser, teacher)
+                if verdict == ACCEPTED:
+                    data_to_insert = [teacher, teaching, leniency, correction, da_quiz, overall_rating_input, comment]
+
+                    try:
+                        _, replicator = get_review_store()
+                        review_id = replicator.submit(data_to_insert)
+                        st.success(f"Review for {teacher} submitted successfully!")
+                        st.session_state.setdefault('submission_ids', {})[teacher] = review_id
+                    except Exception as e:
+                        guard.release(browser, teacher)
+                        st.error(f"Failed to submit review: {e}")
+                elif verdict == DUPLICATE:
+                    st.warning(f"Review for {teacher} has already been submitted. You can only submit one review per teacher.")
+                else:
+                    minutes = max(1, math.ceil(guard.retry_after(client) / 60))
+                    st.warning(f"Too many reviews in a short time. Try again in {minutes} minute{'s' if minutes > 1 else ''}.")
+else:
+    st.write("No teachers found.")
+
+sections.mark("leaderboard")
+
+# --- Leaderboard ---
+with st.expander("Teacher Leaderboard"):
+    analytics = get_review_analytics()
+    lb_col1, lb_col2, lb_col3, lb_col4 = st.columns(4)
+    with lb_col1:
+        leaderboard_order = st.selectbox("Show", ["Best rated", "Lowest rated"], key="leaderboard_order")
+    with lb_col2:
+        leaderboard_criterion = st.selectbox("Criterion", CRITERIA, index=CRITERIA.index("overall"), key="leaderboard_criterion")
+    with lb_col3:
+        department_options = ["All"] + sorted(set(catalog.departments))
+        leaderboard_department = st.selectbox("Department", department_options, key="leaderboard_department")
+    with lb_col4:
+        leaderboard_min_reviews = st.number_input("Minimum reviews", min_value=1, value=3, key="leaderboard_min_reviews")
+    st.dataframe(analytics.leaderboard(
+        criterion=leaderboard_criterion,
+        best=leaderboard_order == "Best rated",
+        min_reviews=int(leaderboard_min_reviews),
+        department=None if leaderboard_department == "All" else leaderboard_department,
+    ))
+    st.caption("Scores are Bayesian averages: teachers with few reviews are pulled towards the overall mean.")
+    st.dataframe(analytics.department_summary())
+
+sections.mark("footer")
+records = get_all_reviews()
+total_reviews = len(records)
+
+# Reviews are served locally; say so when they may be behind the sheet
+replicator = get_review_store()[1]
+if replicator.last_pull is None or time.time() - replicator.last_pull > 3 * replicator.interval:
+    st.caption("Showing the last saved copy of the reviews while Google Sheets catches up.")
+
+st.markdown(
+    f"""
+    <hr style="margin-top: 3rem;">
+    <div style="text-align: center; color: grey; font-size: 1 rem;">
+        Please contribute with reviews, all the old reviews were deleted due to database problems | <a href="https://forms.gle/YFLkZi3UxRtGyxdA9" target="_blank" style="color: #8f8f8f; text-decoration: none; font-weight: bold;">Contact Me</a>
+    </div>
+
+    <div style="text-align: center; color: #4CAF50; font-size: 1.5rem; margin-top: 1rem;">
+        Total number of reviews: {total_reviews}
+    </div>
+
+    """,
+    unsafe_allow_html=True
+)
+
+sections.done()
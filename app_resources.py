@@ -0,0 +1,226 @@
+import os
+
+import gspread
+import streamlit as st
+from google.oauth2.service_account import Credentials
+
+from analytics import RatingAnalytics
+from card_cache import CardCache, build_card
+from catalog import load_catalog
+from images import ThumbnailCache
+from metrics import Exporter, InstrumentedSheet, Observed, cache_misses, cache_requests, cached, register
+from offerings import load_offerings
+from pdf_export import TimetablePDF
+from planner import PlanStore
+from review_snapshot import read_snapshot
+from review_store import ReviewStore, Replicator
+from reviews import build_review_index, clean_name, lookup
+from search_index import SearchIndex
+from submission_guard import SubmissionGuard
+
+# Process-wide resources shared by every page. Pages import this module once
+# per process, so each cached getter is built at most once no matter which
+# page a session opens first.
+
+
+SPREADSHEET_ID = "1QYO7pcHGH3DOjogXCKxTTKQVqaQldePvlcvoawS6gxc"
+
+
+# Called by the review replicator, which keeps the sheet once this succeeds and
+# retries on its next cycle when it raises
+def get_google_sheet():
+    credentials = Credentials.from_service_account_info(
+        st.secrets["gcp_service_account"],
+        scopes=["https://www.googleapis.com/auth/spreadsheets", "https://www.googleapis.com/auth/drive"]
+    )
+    client = gspread.authorize(credentials)
+    sheet = client.open_by_key(SPREADSHEET_ID).sheet1
+    return InstrumentedSheet(sheet)
+
+
+CATALOG_SOURCE = "SCOPE.txt"
+CATALOG_COMPILED = "faculty_catalog.json"
+
+
+# Loaded once per process and reloaded only when SCOPE.txt changes on disk
+@cached(st.cache_resource(max_entries=1))
+def get_catalog(source_stat):
+    return load_catalog(CATALOG_SOURCE, CATALOG_COMPILED)
+
+
+def file_signature(path):
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+OFFERINGS_SOURCE = os.environ.get("OFFERINGS_SOURCE", "offerings.csv")
+
+
+# Course offerings for the planner, indexed once per process and reloaded when
+# the CSV or SCOPE.txt changes (offerings are matched to catalog teachers)
+@cached(st.cache_resource(max_entries=1))
+def load_course_offerings(source_stat, catalog_stat):
+    return load_offerings(OFFERINGS_SOURCE, get_catalog(catalog_stat))
+
+
+def get_offerings():
+    # None when there is no offerings file
+    try:
+        signature = file_signature(OFFERINGS_SOURCE)
+    except OSError:
+        return None
+    return load_course_offerings(signature, file_signature(CATALOG_SOURCE))[0]
+
+
+REVIEW_DB_PATH = os.environ.get("REVIEW_DB_PATH", "reviews.db")
+REVIEW_SNAPSHOT_PATH = os.environ.get("REVIEW_SNAPSHOT_PATH", "reviews_snapshot.npz")
+
+
+# Local SQLite store is the primary read/write path; the Google Sheet is kept in
+# sync by a background replicator thread, which also opens the sheet. An empty
+# store is seeded from the snapshot of the last good pull, so only a first
+# start with no local data at all waits for Google.
+@st.cache_resource
+def get_review_store():
+    store = ReviewStore(REVIEW_DB_PATH)
+    replicator = Replicator(store, interval=65, connect=get_google_sheet, snapshot_path=REVIEW_SNAPSHOT_PATH)
+    if store.count() == 0:
+        snapshot = read_snapshot(REVIEW_SNAPSHOT_PATH)
+        if snapshot is not None:
+            store.apply_remote(snapshot[0], 0, full=True)
+        else:
+            try:
+                replicator.run_once()
+            except Exception as e:
+                st.error(f"Failed to load reviews from Google Sheets: {str(e)}")
+    replicator.start()
+    register_queue_metrics(replicator.queue)
+    return store, replicator
+
+
+QUEUE_COUNTERS = {"batches", "flushed", "failed", "retries"}
+
+
+def register_queue_metrics(queue):
+    # One metric per SubmissionQueue.metrics() value, read at export time
+    for stat in queue.metrics():
+        kind = "counter" if stat in QUEUE_COUNTERS else "gauge"
+        register(Observed(
+            f"submission_queue_{stat.removeprefix('queue_')}" + ("_total" if kind == "counter" else ""),
+            f"Review submission queue {stat.replace('_', ' ')}.",
+            lambda stat=stat: {(): queue.metrics()[stat]},
+            kind,
+        ))
+
+
+# Rebuilt only when the store changes (a local submit or a replicated pull)
+@cached(st.cache_resource(max_entries=2))
+def load_review_snapshot(version):
+    records = get_review_store()[0].records()
+    return records, build_review_index(records)
+
+
+def get_all_reviews():
+    store, _ = get_review_store()
+    return load_review_snapshot(store.version)[0]
+
+
+def get_review_index():
+    store, _ = get_review_store()
+    return load_review_snapshot(store.version)[1]
+
+
+# Vectorized per-teacher statistics, recomputed once per store change
+@cached(st.cache_resource(max_entries=2))
+def load_review_analytics(version):
+    departments = get_catalog(file_signature(CATALOG_SOURCE)).department_map()
+    return RatingAnalytics(load_review_snapshot(version)[0], departments)
+
+
+def get_review_analytics():
+    store, _ = get_review_store()
+    return load_review_analytics(store.version)
+
+
+# Rendered result cards shared by every session; see card_cache
+@st.cache_resource
+def get_card_cache():
+    cache = CardCache()
+    register(Observed("teacher_card_invalidations_total", "Cached teacher cards dropped because the teacher's reviews changed.",
+                      lambda: {(): cache.invalidated}, "counter"))
+    register(Observed("teacher_card_cache_entries", "Teacher cards held in the shared card cache.", lambda: {(): len(cache)}))
+    register(Observed("teacher_card_cache_bytes", "Approximate size of the shared card cache.", lambda: {(): cache.total_bytes}))
+    return cache
+
+
+def get_teacher_card(teacher_id, teacher_name):
+    store, _ = get_review_store()
+    version = store.version
+    index = load_review_snapshot(version)[1]
+
+    def build():
+        cache_misses.inc(function="teacher_card")
+        return build_card(lookup(index, teacher_name))
+
+    cache_requests.inc(function="teacher_card")
+    return get_card_cache().get(teacher_id, clean_name(teacher_name), version, index, build)
+
+
+GUARD_DB_PATH = os.environ.get("GUARD_DB_PATH", "guard.db")
+# Reverse proxies in front of the app that append to X-Forwarded-For; 0 uses the socket address
+TRUSTED_PROXIES = int(os.environ.get("FFCS_TRUSTED_PROXIES", "0"))
+
+
+# Duplicate and rate checks for review submits, shared by every session and
+# kept on disk so a refresh or restart does not reset them
+@st.cache_resource
+def get_submission_guard():
+    guard = SubmissionGuard(GUARD_DB_PATH, trusted_proxies=TRUSTED_PROXIES)
+    register(Observed("submissions_rejected_total", "Review submits turned away by the guard, by verdict.",
+                      lambda: {(("verdict", verdict),): count for verdict, count in guard.rejected.items()}, "counter"))
+    return guard
+
+
+IMAGE_CACHE_DIR = os.environ.get("IMAGE_CACHE_DIR", ".image_cache")
+
+
+# Faculty photos are fetched once per process-wide cache and served as 150 px thumbnails
+@st.cache_resource
+def get_image_cache():
+    cache = ThumbnailCache(IMAGE_CACHE_DIR)
+    register(Observed("thumbnail_lookups_total", "Thumbnail cache lookups, by result.",
+                      lambda: {(("result", "hit"),): cache.hits, (("result", "miss"),): cache.misses}, "counter"))
+    register(Observed("thumbnail_cache_bytes", "Bytes of thumbnails on disk.", lambda: {(): cache.total_bytes}))
+    return cache
+
+
+# Built once per catalog; lookups are ranked and typo tolerant
+@cached(st.cache_resource(max_entries=1))
+def get_search_index(source_hash):
+    catalog = get_catalog(file_signature(CATALOG_SOURCE))
+    return SearchIndex(catalog.names, catalog.search_keys)
+
+
+PLAN_DB_PATH = os.environ.get("PLAN_DB_PATH", "timetables.db")
+
+
+@st.cache_resource
+def get_plan_store():
+    return PlanStore(PLAN_DB_PATH)
+
+
+@st.cache_resource
+def get_pdf_renderer():
+    # Holds the pre-drawn grid template, shared by every session
+    return TimetablePDF()
+
+
+METRICS_FILE = os.environ.get("FFCS_METRICS_FILE")
+METRICS_PORT = os.environ.get("FFCS_METRICS_PORT")
+
+
+# Prometheus text on http://127.0.0.1:$FFCS_METRICS_PORT/metrics and/or
+# rewritten to $FFCS_METRICS_FILE; metrics are still collected when neither is set
+@st.cache_resource
+def get_metrics_exporter():
+    return Exporter(METRICS_FILE, METRICS_PORT).start()
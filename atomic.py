@@ -0,0 +1,21 @@
+import os
+import threading
+from contextlib import contextmanager
+
+
+@contextmanager
+def atomic_write(path, mode="w", **kwargs):
+    # Open file for writing that replaces path only once it is complete, so
+    # readers see the old file or the new one, never half of one. The temp
+    # name is per thread; on error the temp file is removed and path is left as it was.
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp, mode, **kwargs) as f:
+            yield f
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
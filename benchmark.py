@@ -0,0 +1,358 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+import numpy as np
+
+from review_store import SHEET_COLUMNS
+
+DEFAULT_BASELINE = "benchmark_baseline.json"
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "streamlit_app.py")
+
+FIRST_NAMES = ["Karthikeyan", "Indhira", "Ramesh", "Priya", "Suresh", "Lakshmi", "Vijay", "Anitha", "Mohan", "Divya",
+               "Arun", "Kavitha", "Senthil", "Meena", "Rajesh", "Deepa", "Ganesh", "Revathi", "Bala", "Sangeetha"]
+LAST_NAMES = ["K", "M", "P", "S", "R", "Kumar", "Raman", "Natarajan", "Subramanian", "Iyer", "Pillai", "Nair",
+              "Reddy", "Rao", "Krishnan", "Murugan", "Srinivasan", "Venkatesh", "Balaji", "Chandran"]
+DEPARTMENTS = ["SCOPE", "SENSE", "SELECT", "SMEC", "SAS"]
+WORKSHEETS = ["Reviews", "Departments", "Offerings", "Flags"]
+TIMETABLE_COURSES = ["A1+TA1", "B1+TB1", "C1+TC1", "D1+TD1", "E1+TE1", "F1+TF1", "L31+L32", "L45+L46"]
+
+
+# --- Synthetic data ---
+def synthetic_scope(path, faculty, image_url, seed=0):
+    # SCOPE.txt-format catalog of `faculty` distinct names; returns the names
+    rng = random.Random(seed)
+    names = []
+    seen = set()
+    while len(names) < faculty:
+        name = f"Dr. {rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+        if name in seen:
+            name = f"{name} {len(names)}"
+        seen.add(name)
+        names.append(name)
+    with open(path, "w") as f:
+        for name in names:
+            f.write(f"Name: {name}\n")
+            f.write(f"Department: {rng.choice(DEPARTMENTS)}\n")
+            f.write(f"Image: {image_url}\n\n")
+    return names
+
+
+def synthetic_reviews(names, count, seed=0):
+    # Sheet rows in SHEET_COLUMNS order; a few teachers get most of the reviews
+    rng = random.Random(seed)
+    weights = [1 / (rank + 1) for rank in range(len(names))]
+    rows = []
+    for name in rng.choices(names, weights=weights, k=count):
+        scores = [rng.randint(0, 10) for _ in range(4)]
+        rows.append([name] + scores + [sum(scores) / 4, rng.choice(["-", "good", "strict but fair", ""])])
+    return rows
+
+
+# In-memory stand-in for a gspread Worksheet, covering the calls the app makes.
+# Every call sleeps for latency seconds to stand in for the network round trip.
+class FakeSheet:
+    def __init__(self, rows, header=SHEET_COLUMNS, latency=0.0):
+        self.header = list(header)
+        self.rows = [[str(value) for value in row] for row in rows]
+        self.latency = latency
+        self.calls = 0
+
+    def _call(self):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def get_all_values(self):
+        self._call()
+        return [list(self.header)] + [list(row) for row in self.rows]
+
+    def get_all_records(self):
+        self._call()
+        return [dict(zip(self.header, row)) for row in self.rows]
+
+    def get_values(self, range_name=None, **kwargs):
+        self._call()
+        start = int(re.match(r"[A-Z]+(\d+)", range_name).group(1)) if range_name else 1
+        return [list(row) for row in ([self.header] + self.rows)[start - 1:]]
+
+    def append_rows(self, rows, **kwargs):
+        self._call()
+        first = len(self.rows) + 2
+        self.rows.extend([str(value) for value in row] for row in rows)
+        return {"updates": {"updatedRange": f"Sheet1!A{first}:G{first + len(rows) - 1}"}}
+
+    def append_row(self, row, **kwargs):
+        return self.append_rows([row], **kwargs)
+
+
+@contextmanager
+def fake_gspread(sheet):
+    # Routes the app's service-account login and open_by_key to sheet
+    import gspread
+    from google.oauth2.service_account import Credentials
+
+    class Client:
+        def open_by_key(self, key):
+            return type("Spreadsheet", (), {"sheet1": sheet})()
+
+    authorize, from_info = gspread.authorize, Credentials.from_service_account_info
+    gspread.authorize = lambda credentials: Client()
+    Credentials.from_service_account_info = classmethod(lambda cls, info, **kwargs: object())
+    try:
+        yield sheet
+    finally:
+        gspread.authorize = authorize
+        Credentials.from_service_account_info = from_info
+
+
+# --- Measurement ---
+def measure(fn, repeat, setup=None):
+    # p50/p95 wall time over repeat calls, then peak traced memory of one more call
+    times = []
+    for _ in range(repeat):
+        arg = setup() if setup else None
+        started = time.perf_counter()
+        fn(arg) if setup else fn()
+        times.append((time.perf_counter() - started) * 1000)
+    arg = setup() if setup else None
+    tracemalloc.start()
+    try:
+        fn(arg) if setup else fn()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {
+        "p50_ms": round(float(np.percentile(times, 50)), 3),
+        "p95_ms": round(float(np.percentile(times, 95)), 3),
+        "peak_kb": round(peak / 1024, 1),
+    }
+
+
+def run_paths(workdir, names, sheet, repeat, seed=0):
+    # Module-level code paths, called directly
+    from analytics import RatingAnalytics
+    from catalog import compile_catalog, parse_scope
+    from pdf_export import TimetablePDF, sample_item
+    from reviews import build_review_index, lookup
+    from search_index import SearchIndex
+    from sheet_sync import ReviewSync
+    from sheets_client import FakeBackend, SheetsClient, worksheet_range
+    from timetable import SlotState, _table_html, cell_html, clash_engine, parse_slots, render_timetable_html
+
+    rng = random.Random(seed)
+    source = os.path.join(workdir, "SCOPE.txt")
+    results = {}
+
+    results["load_teachers"] = measure(lambda: compile_catalog(source), repeat)
+    catalog = compile_catalog(source)
+    assert len(parse_scope(source)) == len(names)
+
+    search_index = SearchIndex(catalog.names, catalog.search_keys)
+    queries = [rng.choice(names).split()[-1].lower() for _ in range(50)]
+    queries += [name[4:4 + rng.randint(3, 8)] for name in rng.sample(names, 50)]
+    results["search"] = measure(lambda: [search_index.search(query) for query in queries], repeat)
+
+    results["sheet_sync"] = measure(lambda: ReviewSync(sheet).refresh(force=True), repeat)
+    records = ReviewSync(sheet).refresh(force=True)
+
+    # Four worksheets read through the async client: one batchGet for all of
+    # them, and one batchGet each sent concurrently
+    backend = FakeBackend({name: [sheet.header] + sheet.rows for name in WORKSHEETS}, latency=sheet.latency)
+    client = SheetsClient("benchmark", backend)
+    results["sheets_batch_get"] = measure(lambda: client.read_worksheets(WORKSHEETS), repeat)
+    batches = {name: [worksheet_range(name)] for name in WORKSHEETS}
+    results["sheets_gather"] = measure(lambda: asyncio.run(client.gather(batches)), repeat)
+    client.close()
+
+    results["build_review_index"] = measure(lambda: build_review_index(records), repeat)
+    departments = catalog.department_map()
+    results["aggregation"] = measure(lambda: RatingAnalytics(records, departments), repeat)
+
+    index = build_review_index(records)
+    lookups = [rng.choice(names) for _ in range(200)]
+    results["teacher_lookup"] = measure(lambda: [lookup(index, name) for name in lookups], repeat)
+
+    state = SlotState()
+    for i, course in enumerate(TIMETABLE_COURSES):
+        clash_engine.add(state, parse_slots(course), i)
+    candidates = [parse_slots(f"{rng.choice('ABCDEFG')}{rng.randint(1, 2)}+L{rng.randint(1, 59)}") for _ in range(200)]
+    results["clash_check"] = measure(lambda: [clash_engine.check(slots, state) for slots in candidates], repeat)
+
+    item = sample_item()
+
+    def cold_render(_):
+        render_timetable_html(item["timetable"], item["cell_is_lab"])
+
+    def clear_render_caches():
+        _table_html.cache_clear()
+        cell_html.cache_clear()
+
+    results["render_timetable_cold"] = measure(cold_render, repeat, setup=clear_render_caches)
+    results["render_timetable"] = measure(lambda: render_timetable_html(item["timetable"], item["cell_is_lab"]), repeat)
+
+    renderer = TimetablePDF()
+    renderer.template()
+    results["export_pdf"] = measure(
+        lambda: renderer.render(item["timetable"], item["cell_is_lab"], item["faculty_list"]), repeat
+    )
+    return results
+
+
+def run_apptest(workdir, names, sheet, repeat):
+    # The same paths end to end, through Streamlit's AppTest and the real pages
+    import streamlit as st
+    from streamlit.testing.v1 import AppTest
+
+    def new_app():
+        app = AppTest.from_file(APP_PATH, default_timeout=120)
+        app.secrets["gcp_service_account"] = {"type": "service_account"}
+        return app
+
+    def fresh_start(keep_snapshot=False):
+        # Empty caches and local databases, as after a deploy
+        st.cache_resource.clear()
+        st.cache_data.clear()
+        for entry in os.listdir(workdir):
+            if entry.endswith((".db", ".db-wal", ".db-shm")) or entry == "faculty_catalog.json":
+                os.remove(os.path.join(workdir, entry))
+            elif entry == "reviews_snapshot.npz" and not keep_snapshot:
+                os.remove(os.path.join(workdir, entry))
+
+    def check(app):
+        if app.exception:
+            raise RuntimeError(f"App raised: {app.exception[0].message}")
+
+    results = {}
+    with fake_gspread(sheet):
+        cold_runs = max(1, min(3, repeat))
+        results["app_cold_start"] = measure(lambda _: check(new_app().run()), cold_runs, setup=fresh_start)
+        # The same, but seeded from the review snapshot the previous start wrote
+        results["app_cold_start_snapshot"] = measure(
+            lambda _: check(new_app().run()), cold_runs, setup=lambda: fresh_start(keep_snapshot=True)
+        )
+
+        app = new_app().run()
+        check(app)
+        query = [names[0].split()[-1]]
+
+        def search(_):
+            app.text_input[0].set_value(query[0]).run()
+            check(app)
+
+        def next_query():
+            query[0] = random.choice(names).split()[1][:5]
+
+        results["app_search"] = measure(search, repeat, setup=next_query)
+
+        app.switch_page("app_pages/ffcs_planner.py").run()
+        for i, course in enumerate(TIMETABLE_COURSES):
+            app.text_input(key="course_code").set_value(f"BEN{1000 + i}")
+            app.text_input(key="slot_str").set_value(course)
+            next(button for button in app.button if button.label == "Add to Timetable").click()
+            app.run()
+        check(app)
+        if len(app.session_state["plan"]) != len(TIMETABLE_COURSES):
+            raise RuntimeError("Planner did not accept the benchmark timetable")
+        results["app_planner_rerun"] = measure(lambda: check(app.run()), repeat)
+
+        def export(_):
+            next(button for button in app.button if button.label == "Export as PDF").click()
+            app.run()
+            check(app)
+
+        results["app_export_pdf"] = measure(export, repeat, setup=lambda: None)
+    return results
+
+
+def compare(results, baseline, tolerance):
+    # Regressions as readable lines: median time or peak memory past tolerance x
+    # baseline. p95 is reported but not gated on; with a handful of runs it is
+    # just the single slowest one. Sub-millisecond timings are skipped as noise.
+    problems = []
+    for path, current in results.items():
+        previous = baseline.get(path)
+        if previous is None:
+            continue
+        if previous["p50_ms"] >= 1 and current["p50_ms"] > previous["p50_ms"] * tolerance:
+            problems.append(f"{path}: p50 {current['p50_ms']} ms vs baseline {previous['p50_ms']} ms")
+        if previous["peak_kb"] >= 64 and current["peak_kb"] > previous["peak_kb"] * tolerance:
+            problems.append(f"{path}: peak {current['peak_kb']} KiB vs baseline {previous['peak_kb']} KiB")
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the review and planner code paths on synthetic data.")
+    parser.add_argument("--faculty", type=int, default=5000)
+    parser.add_argument("--reviews", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--sheet-latency", type=float, default=0.3, help="seconds added to every fake Sheets call")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--tolerance", type=float, default=2.0, help="allowed slowdown/growth factor over the baseline")
+    parser.add_argument("--update-baseline", action="store_true", help="store these results as the new baseline")
+    parser.add_argument("--skip-app", action="store_true", help="skip the end-to-end AppTest runs")
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix="faculty-bench-")
+    cwd = os.getcwd()
+    baseline_path = os.path.abspath(args.baseline)
+    # The app reads these when app_resources is first imported
+    os.environ["REVIEW_DB_PATH"] = os.path.join(workdir, "reviews.db")
+    os.environ["REVIEW_SNAPSHOT_PATH"] = os.path.join(workdir, "reviews_snapshot.npz")
+    os.environ["GUARD_DB_PATH"] = os.path.join(workdir, "guard.db")
+    os.environ["PLAN_DB_PATH"] = os.path.join(workdir, "timetables.db")
+    os.environ["IMAGE_CACHE_DIR"] = os.path.join(workdir, "images")
+    try:
+        # Faculty photos come from a local file so thumbnails never touch the network
+        from PIL import Image
+        image_path = os.path.join(workdir, "photo.png")
+        Image.new("RGB", (300, 400), (120, 140, 160)).save(image_path)
+        names = synthetic_scope(os.path.join(workdir, "SCOPE.txt"), args.faculty, f"file://{image_path}", args.seed)
+        sheet = FakeSheet(synthetic_reviews(names, args.reviews, args.seed), latency=args.sheet_latency)
+        os.chdir(workdir)
+
+        results = run_paths(workdir, names, sheet, args.repeat, args.seed)
+        if not args.skip_app:
+            results.update(run_apptest(workdir, names, sheet, args.repeat))
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(f"{args.faculty} faculty, {args.reviews} reviews, {args.sheet_latency}s per Sheets call, {args.repeat} runs per path")
+    print(f"{'path':<24}{'p50 ms':>10}{'p95 ms':>10}{'peak KiB':>12}")
+    for path, result in results.items():
+        print(f"{path:<24}{result['p50_ms']:>10.2f}{result['p95_ms']:>10.2f}{result['peak_kb']:>12.1f}")
+
+    settings = {"faculty": args.faculty, "reviews": args.reviews, "sheet_latency": args.sheet_latency}
+    if args.update_baseline:
+        with open(baseline_path, "w") as f:
+            json.dump({"settings": settings, "results": results}, f, indent=2)
+        print(f"Baseline written to {baseline_path}")
+        return 0
+    try:
+        with open(baseline_path) as f:
+            baseline = json.load(f)
+    except OSError:
+        print("No baseline to compare against; run with --update-baseline to store one.")
+        return 0
+    if baseline.get("settings") != settings:
+        print(f"Baseline was recorded with {baseline.get('settings')}; not comparing.")
+        return 0
+    problems = compare(results, baseline["results"], args.tolerance)
+    for problem in problems:
+        print(f"REGRESSION {problem}")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
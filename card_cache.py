@@ -0,0 +1,101 @@
+import threading
+from collections import OrderedDict
+
+from reviews import COMMENT_COL, SCORE_COLS, average
+
+
+def render_reviews(reviews):
+    # Markdown list of one teacher's reviews, as shown under "Load reviews"
+    review_lines = []
+    for review in reviews:
+        comment = review.get(COMMENT_COL, '-')
+        comment_display = f"*{comment}*" if comment != '-' else '-'
+        review_lines.append(
+            f"- **Teaching**: {review.get(SCORE_COLS['teaching'], 'N/A')} | **Leniency**: {review.get(SCORE_COLS['leniency'], 'N/A')} | "
+            f"**Correction**: {review.get(SCORE_COLS['correction'], 'N/A')} | **DA/Quiz**: {review.get(SCORE_COLS['da_quiz'], 'N/A')} | "
+            f"**Comment**: {comment_display}")
+    return "\n".join(review_lines)
+
+
+def build_card(entry):
+    # Everything on a teacher's result card that depends only on their own
+    # reviews. entry is their review index entry, or None. The photo is not
+    # part of it: the thumbnail cache already keeps those, and a card must
+    # not hold on to a missing photo until the teacher's next review.
+    if not entry:
+        return {"count": 0, "rating": None, "reviews": ""}
+    return {
+        "count": entry["count"],
+        "rating": f"### Overall Rating: {average(entry):.2f} / 10 ({entry['count']} reviews)",
+        "reviews": render_reviews(entry["reviews"]),
+    }
+
+
+def card_size(card):
+    return len(card["rating"] or "") + len(card["reviews"])
+
+
+def _changed(old, new):
+    if old is new:
+        return False
+    return old is None or new is None or old["count"] != new["count"] or old["reviews"] != new["reviews"]
+
+
+# Rendered teacher cards shared by every session, least recently used first
+# out past max_entries or max_bytes. Cards are built for one dataset version
+# (the review store's version); when a newer version arrives, sync() compares
+# the old and new review index and drops only the cards of teachers whose
+# reviews changed, so everyone else's card survives unrelated submits.
+class CardCache:
+    def __init__(self, max_entries=2000, max_bytes=32 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.version = None
+        self.total_bytes = 0
+        self.invalidated = 0
+        self._index = {}
+        self._cards = OrderedDict()  # teacher_id -> (teacher_key, card, size)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._cards)
+
+    def sync(self, version, index):
+        # Moves the cache to version, whose review index is index; returns how
+        # many cards were dropped
+        with self._lock:
+            if self.version is not None and version <= self.version:
+                return 0
+            changed = {key for key in self._index.keys() | index.keys() if _changed(self._index.get(key), index.get(key))}
+            stale = [teacher_id for teacher_id, (key, _, _) in self._cards.items() if key in changed]
+            for teacher_id in stale:
+                self._drop(teacher_id)
+            self.invalidated += len(stale)
+            self.version, self._index = version, index
+            return len(stale)
+
+    def get(self, teacher_id, teacher_key, version, index, build):
+        # Card for teacher_id at version, calling build() on a miss. A rerun
+        # still reading an older version gets a fresh card that is not kept.
+        if self.version is None or version > self.version:
+            self.sync(version, index)
+        with self._lock:
+            cached = self._cards.get(teacher_id) if version == self.version else None
+            if cached is not None:
+                self._cards.move_to_end(teacher_id)
+                return cached[1]
+        card = build()
+        with self._lock:
+            if version == self.version:
+                if teacher_id in self._cards:
+                    self._drop(teacher_id)
+                size = card_size(card)
+                self._cards[teacher_id] = (teacher_key, card, size)
+                self.total_bytes += size
+                while self._cards and (len(self._cards) > self.max_entries or self.total_bytes > self.max_bytes):
+                    self._drop(next(iter(self._cards)))
+        return card
+
+    def _drop(self, teacher_id):
+        _, _, size = self._cards.pop(teacher_id)
+        self.total_bytes -= size
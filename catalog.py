@@ -0,0 +1,147 @@
+import hashlib
+import json
+import os
+import sys
+
+from atomic import atomic_write
+from reviews import clean_name
+from search_index import normalize
+
+CATALOG_FORMAT = 2
+DEFAULT_SOURCE = "SCOPE.txt"
+DEFAULT_COMPILED = "faculty_catalog.json"
+
+
+def parse_scope(path):
+    # SCOPE.txt is "Name: ..." / "Image: ..." line pairs separated by blank lines.
+    # An optional "Department: ..." line before Image overrides the default
+    # department, which is the file's name (SCOPE.txt -> "SCOPE").
+    default_department = os.path.splitext(os.path.basename(path))[0]
+    teachers = []
+    with open(path, 'r') as f:
+        teacher_name = None
+        department = default_department
+        for line in f:
+            if line.startswith("Name:"):
+                teacher_name = line.strip().replace("Name: ", "")
+                department = default_department
+            elif line.startswith("Department:"):
+                department = line.strip().replace("Department: ", "")
+            elif line.startswith("Image:"):
+                image_url = line.strip().replace("Image: ", "")
+                if teacher_name and image_url:
+                    teachers.append((teacher_name, image_url, department))
+                teacher_name = None
+    return teachers
+
+
+def file_hash(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+# Columnar, precompiled view of the faculty list. ids are stable across
+# recompiles: an existing (name, image) pair keeps its id, new ones get fresh ids.
+class Catalog:
+    def __init__(self, ids, names, images, departments, normalized, search_keys, source_hash):
+        self.ids = ids
+        self.names = names
+        self.images = images
+        self.departments = departments
+        self.normalized = normalized
+        self.search_keys = search_keys
+        self.source_hash = source_hash
+
+    def __len__(self):
+        return len(self.ids)
+
+    def teachers(self):
+        return list(zip(self.names, self.images))
+
+    def department_map(self):
+        # clean_name -> department, as used by the review analytics
+        return dict(zip(self.normalized, self.departments))
+
+    def to_json(self):
+        return {
+            "format": CATALOG_FORMAT,
+            "source_hash": self.source_hash,
+            "ids": self.ids,
+            "names": self.names,
+            "images": self.images,
+            "departments": self.departments,
+            "normalized": self.normalized,
+            "search_keys": self.search_keys,
+        }
+
+    @classmethod
+    def from_json(cls, data):
+        return cls(
+            data["ids"], data["names"], data["images"], data["departments"],
+            data["normalized"], data["search_keys"], data["source_hash"],
+        )
+
+
+def compile_catalog(source=DEFAULT_SOURCE, previous=None):
+    teachers = parse_scope(source)
+    known = {}
+    next_id = 0
+    if previous is not None:
+        known = {(name, image): teacher_id for teacher_id, name, image in zip(previous.ids, previous.names, previous.images)}
+        next_id = max(previous.ids, default=-1) + 1
+    ids = []
+    used = set()
+    for name, image, _ in teachers:
+        teacher_id = known.get((name, image))
+        if teacher_id is None or teacher_id in used:
+            teacher_id = next_id
+            next_id += 1
+        used.add(teacher_id)
+        ids.append(teacher_id)
+    return Catalog(
+        ids,
+        [name for name, _, _ in teachers],
+        [image for _, image, _ in teachers],
+        [department for _, _, department in teachers],
+        [clean_name(name) for name, _, _ in teachers],
+        [normalize(name) for name, _, _ in teachers],
+        file_hash(source),
+    )
+
+
+def read_catalog(path):
+    try:
+        with open(path, 'r') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if data.get("format") != CATALOG_FORMAT:
+        return None
+    return Catalog.from_json(data)
+
+
+def write_catalog(catalog, path):
+    with atomic_write(path) as f:
+        json.dump(catalog.to_json(), f, separators=(",", ":"), ensure_ascii=False)
+
+
+def load_catalog(source=DEFAULT_SOURCE, compiled=DEFAULT_COMPILED):
+    # Uses the compiled catalog when it was built from the current source file,
+    # otherwise recompiles (keeping ids) and tries to save the result
+    catalog = read_catalog(compiled)
+    if catalog is not None and catalog.source_hash == file_hash(source):
+        return catalog
+    catalog = compile_catalog(source, previous=catalog)
+    try:
+        write_catalog(catalog, compiled)
+    except OSError:
+        pass
+    return catalog
+
+
+if __name__ == "__main__":
+    source = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_SOURCE
+    compiled = sys.argv[2] if len(sys.argv) > 2 else DEFAULT_COMPILED
+    catalog = compile_catalog(source, previous=read_catalog(compiled))
+    write_catalog(catalog, compiled)
+    print(f"Compiled {len(catalog)} teachers from {source} into {compiled}")
@@ -0,0 +1,12 @@
+import sqlite3
+
+
+def connect(path, schema):
+    # One connection shared by a store's threads (each store serializes use
+    # with its own lock). WAL lets readers run alongside the writer;
+    # synchronous=NORMAL syncs on checkpoints rather than on every commit.
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(schema)
+    return conn
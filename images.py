@@ -0,0 +1,179 @@
+import hashlib
+import io
+import logging
+import os
+import sys
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image
+
+from atomic import atomic_write
+
+logger = logging.getLogger(__name__)
+
+THUMBNAIL_WIDTH = 150
+FETCH_TIMEOUT = 10
+USER_AGENT = "Mozilla/5.0 (faculty-review thumbnail cache)"
+
+
+def fetch(url, timeout=FETCH_TIMEOUT):
+    request = urllib.request.Request(url, headers={"User-Agent": USER_AGENT})
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return response.read()
+
+
+def make_thumbnail(data, width=THUMBNAIL_WIDTH):
+    with Image.open(io.BytesIO(data)) as image:
+        image = image.convert("RGBA" if image.mode in ("RGBA", "LA", "P") else "RGB")
+        if image.width > width:
+            image = image.resize((width, max(1, round(image.height * width / image.width))), Image.LANCZOS)
+        out = io.BytesIO()
+        image.save(out, format="WEBP", quality=80, method=4)
+        return out.getvalue()
+
+
+# Disk cache of resized faculty images. Thumbnails are stored once under the
+# sha256 of their bytes (blobs/), and each source URL has a small ref file
+# (refs/) pointing at its blob, so identical images share storage. Blob mtimes
+# track last use; the least recently used blobs are evicted past max_bytes.
+class ThumbnailCache:
+    def __init__(self, directory=".image_cache", max_bytes=50 * 1024 * 1024, width=THUMBNAIL_WIDTH, fetcher=fetch, retry_after=600):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.width = width
+        self.fetcher = fetcher
+        self.retry_after = retry_after
+        self._failed = {}  # url -> time of the last failed fetch
+        self.blob_dir = os.path.join(directory, "blobs")
+        self.ref_dir = os.path.join(directory, "refs")
+        os.makedirs(self.blob_dir, exist_ok=True)
+        os.makedirs(self.ref_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self.total_bytes = sum(entry.stat().st_size for entry in os.scandir(self.blob_dir) if entry.is_file())
+        self.hits = 0
+        self.misses = 0
+        self._warming = set()  # urls being fetched in the background
+        self._pool = None
+
+    def _ref_path(self, url):
+        return os.path.join(self.ref_dir, hashlib.sha256(f"{self.width}:{url}".encode("utf-8")).hexdigest())
+
+    def _blob_path(self, digest):
+        return os.path.join(self.blob_dir, f"{digest}.webp")
+
+    def cached(self, url):
+        # Thumbnail bytes if already on disk, without fetching. This is the
+        # lookup pages make, so it is what hits and misses count.
+        data = self._read(url)
+        if data is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return data
+
+    def _read(self, url):
+        try:
+            with open(self._ref_path(url), "r") as f:
+                path = self._blob_path(f.read().strip())
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return data
+
+    def get(self, url):
+        # Thumbnail bytes, fetching and caching them on a miss; None when the
+        # fetch fails (retried after retry_after seconds)
+        data = self._read(url)
+        if data is not None:
+            return data
+        failed_at = self._failed.get(url)
+        if failed_at is not None and time.monotonic() - failed_at < self.retry_after:
+            return None
+        try:
+            data = make_thumbnail(self.fetcher(url), self.width)
+        except Exception as e:
+            logger.warning("Could not cache image %s: %s", url, e)
+            self._failed[url] = time.monotonic()
+            return None
+        self._failed.pop(url, None)
+        self.put(url, data)
+        return data
+
+    def put(self, url, data):
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._blob_path(digest)
+        with self._lock:
+            if not os.path.exists(path):
+                _write(path, data)
+                self.total_bytes += len(data)
+            _write(self._ref_path(url), digest.encode("ascii"))
+            if self.total_bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        # Drop least recently used blobs down to 90% of the budget. Refs to
+        # evicted blobs are left behind and simply miss on the next lookup.
+        blobs = sorted(
+            (entry for entry in os.scandir(self.blob_dir) if entry.is_file()),
+            key=lambda entry: entry.stat().st_mtime,
+        )
+        target = self.max_bytes * 0.9
+        for entry in blobs:
+            if self.total_bytes <= target:
+                break
+            size = entry.stat().st_size
+            try:
+                os.remove(entry.path)
+            except OSError:
+                continue
+            self.total_bytes -= size
+
+    def warm(self, url, workers=4):
+        # Fetches url into the cache on a background thread, so a page can
+        # show the original image now and the thumbnail on a later rerun
+        with self._lock:
+            if url in self._warming:
+                return
+            self._warming.add(url)
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="thumbnails")
+        self._pool.submit(self._warm, url)
+
+    def _warm(self, url):
+        try:
+            self.get(url)
+        except Exception as e:
+            logger.warning("Could not cache image %s: %s", url, e)
+        finally:
+            with self._lock:
+                self._warming.discard(url)
+
+    def prewarm(self, urls, workers=8):
+        # Fetches every URL not already cached; returns how many are now cached
+        missing = [url for url in dict.fromkeys(urls) if self._read(url) is None]
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(self.get, missing))
+        return len(set(urls)) - len(missing) + sum(data is not None for data in results)
+
+
+def _write(path, data):
+    with atomic_write(path, "wb") as f:
+        f.write(data)
+
+
+if __name__ == "__main__":
+    # Offline prewarm: python images.py [cache_dir]
+    from catalog import load_catalog
+
+    cache = ThumbnailCache(sys.argv[1] if len(sys.argv) > 1 else ".image_cache")
+    catalog = load_catalog()
+    cached = cache.prewarm(catalog.images)
+    print(f"{cached}/{len(set(catalog.images))} faculty thumbnails cached in {cache.directory} ({cache.total_bytes} bytes)")
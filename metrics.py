@@ -0,0 +1,305 @@
+import bisect
+import functools
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from atomic import atomic_write
+
+logger = logging.getLogger(__name__)
+
+PREFIX = "ffcs_"
+# Seconds; spans range from cached lookups (~1 ms) to cold Sheets reads (~10 s)
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+ACTIVE_SESSION_WINDOW = 300
+
+
+def _label_text(labels):
+    if not labels:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in labels)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(labels, escaped)) + "}"
+
+
+# Minimal Prometheus-style metrics. Each metric keeps one value (or one set of
+# buckets) per label combination behind a single lock; recording is a dict
+# lookup and an add, cheap enough to leave on for every rerun.
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name, help_text):
+        self.name = PREFIX + name
+        self.help = help_text
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(tuple(sorted(labels.items())), 0)
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, key, value) for key, value in self._values.items()]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name, help_text, buckets=DEFAULT_BUCKETS):
+        self.name = PREFIX + name
+        self.help = help_text
+        self.buckets = tuple(buckets)
+        self._values = {}  # labels -> [per-bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(sorted(labels.items()))
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            entry[i] += 1
+            entry[-1] += value
+
+    def count(self, **labels):
+        entry = self._values.get(tuple(sorted(labels.items())))
+        return sum(entry[:-1]) if entry else 0
+
+    def samples(self):
+        samples = []
+        with self._lock:
+            items = [(key, list(entry)) for key, entry in self._values.items()]
+        for key, entry in items:
+            running = 0
+            for bound, n in zip(self.buckets + (float("inf"),), entry[:-1]):
+                running += n
+                le = "+Inf" if bound == float("inf") else repr(float(bound))
+                samples.append((f"{self.name}_bucket", key + (("le", le),), running))
+            samples.append((f"{self.name}_sum", key, entry[-1]))
+            samples.append((f"{self.name}_count", key, running))
+        return samples
+
+
+# Samples read at export time from counters a component keeps itself;
+# read() returns {labels: value} with labels as in Counter, e.g.
+# {(("result", "hit"),): 12}
+class Observed:
+    def __init__(self, name, help_text, read, kind="gauge"):
+        self.name = PREFIX + name
+        self.help = help_text
+        self.read = read
+        self.kind = kind
+
+    def samples(self):
+        return [(self.name, key, value) for key, value in self.read().items()]
+
+
+sheets_call_seconds = Histogram("sheets_call_seconds", "Google Sheets API call duration by method.")
+sheets_call_errors = Counter("sheets_call_errors_total", "Google Sheets API calls that raised, by method.")
+cache_requests = Counter("cache_requests_total", "Calls to cached loaders, by function.")
+cache_misses = Counter("cache_misses_total", "Cached loader calls that had to compute, by function.")
+rerun_seconds = Histogram("rerun_seconds", "Wall time of a full script rerun, by page.")
+section_seconds = Histogram("rerun_section_seconds", "Wall time of one section of a rerun, by page and section.")
+sessions_started = Counter("sessions_started_total", "Browser sessions started.")
+active_sessions = Gauge("active_sessions", f"Sessions that reran in the last {ACTIVE_SESSION_WINDOW} seconds.")
+REGISTRY = [sheets_call_seconds, sheets_call_errors, cache_requests, cache_misses,
+            rerun_seconds, section_seconds, sessions_started, active_sessions]
+
+_registry_lock = threading.Lock()
+
+
+def register(metric):
+    # Adds metric to REGISTRY, replacing any metric of the same name, so a
+    # rebuilt cache resource can register its counters again
+    with _registry_lock:
+        REGISTRY[:] = [m for m in REGISTRY if m.name != metric.name] + [metric]
+    return metric
+
+
+_sessions = {}  # session id -> monotonic time of its last rerun
+_sessions_lock = threading.Lock()
+
+
+@contextmanager
+def span(histogram, **labels):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        histogram.observe(time.perf_counter() - started, **labels)
+
+
+# Splits one rerun of a page into consecutive sections: mark(name) ends the
+# current section and starts the next one, done() ends the last. Sections
+# cut short by st.rerun() or an exception are not recorded.
+class Sections:
+    def __init__(self, page):
+        self.page = page
+        self.current = None
+        self.started = time.perf_counter()
+
+    def mark(self, name):
+        now = time.perf_counter()
+        if self.current is not None:
+            section_seconds.observe(now - self.started, page=self.page, section=self.current)
+        self.current, self.started = name, now
+
+    def done(self):
+        self.mark(None)
+
+
+def touch_session(session_id):
+    # Called once per rerun; counts new sessions and keeps the active gauge fresh
+    now = time.monotonic()
+    with _sessions_lock:
+        if session_id not in _sessions:
+            sessions_started.inc()
+        _sessions[session_id] = now
+        for stale in [sid for sid, seen in _sessions.items() if now - seen > ACTIVE_SESSION_WINDOW]:
+            del _sessions[stale]
+        active_sessions.set(len(_sessions))
+
+
+def cached(cache_decorator, name=None):
+    # Wraps a Streamlit cache decorator so requests and misses are counted:
+    #     @cached(st.cache_resource(max_entries=1))
+    # The inner function only runs on a miss. functools.wraps keeps the
+    # original's name and source, which is what Streamlit keys the cache on.
+    def decorate(fn):
+        label = name or fn.__name__
+
+        @functools.wraps(fn)
+        def compute(*args, **kwargs):
+            cache_misses.inc(function=label)
+            return fn(*args, **kwargs)
+
+        cached_fn = cache_decorator(compute)
+
+        @functools.wraps(fn)
+        def call(*args, **kwargs):
+            cache_requests.inc(function=label)
+            return cached_fn(*args, **kwargs)
+
+        call.clear = cached_fn.clear
+        return call
+
+    return decorate
+
+
+# Forwards every method call to a gspread worksheet, timing it into
+# sheets_call_seconds. Non-callable attributes pass straight through.
+class InstrumentedSheet:
+    def __init__(self, sheet):
+        self._sheet = sheet
+
+    def __getattr__(self, name):
+        attr = getattr(self._sheet, name)
+        if not callable(attr):
+            return attr
+
+        @functools.wraps(attr)
+        def timed(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return attr(*args, **kwargs)
+            except Exception:
+                sheets_call_errors.inc(method=name)
+                raise
+            finally:
+                sheets_call_seconds.observe(time.perf_counter() - started, method=name)
+
+        return timed
+
+
+def render(registry=REGISTRY):
+    # Prometheus text exposition format
+    lines = []
+    for metric in list(registry):
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        for sample_name, labels, value in metric.samples():
+            lines.append(f"{sample_name}{_label_text(labels)} {value}")
+    return "\n".join(lines) + "\n"
+
+
+def write_file(path, registry=REGISTRY):
+    with atomic_write(path) as f:
+        f.write(render(registry))
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+# Publishes the registry as a file rewritten every interval seconds, on
+# http://host:port/metrics, or both
+class Exporter:
+    def __init__(self, path=None, port=None, host="127.0.0.1", interval=15):
+        self.path = path
+        self.port = port
+        self.host = host
+        self.interval = interval
+        self._stop = threading.Event()
+        self._threads = []
+        self.server = None
+
+    def start(self):
+        # A port that cannot be bound is logged and skipped; pages must keep working
+        if self.port:
+            try:
+                self.server = ThreadingHTTPServer((self.host, int(self.port)), _Handler)
+            except OSError as e:
+                logger.error("Could not serve metrics on %s:%s: %s", self.host, self.port, e)
+            else:
+                self._threads.append(threading.Thread(target=self.server.serve_forever, name="metrics-http", daemon=True))
+        if self.path:
+            self._threads.append(threading.Thread(target=self._write_loop, name="metrics-file", daemon=True))
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def _write_loop(self):
+        while True:
+            try:
+                write_file(self.path)
+            except OSError as e:
+                logger.warning("Could not write metrics to %s: %s", self.path, e)
+            if self._stop.wait(self.interval):
+                break
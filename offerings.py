@@ -0,0 +1,131 @@
+import csv
+import sys
+
+from planner import COURSE_FIELDS, SLOT_NAMES, mask_to_slots, slots_to_mask
+from reviews import clean_name
+from timetable import clash_engine, describe_problems, parse_slots
+
+DEFAULT_SOURCE = "offerings.csv"
+
+
+def bits(mask):
+    # Positions of the set bits of mask, lowest first
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+# Every course offering (course -> faculty -> slots -> room) with indexes by
+# course, faculty and slot. Sets of offerings are int bitsets over offering ids
+# (bit i is rows[i]), so narrowing them is a few ANDs. slot_clash[i] is every
+# offering that clashes with SLOT_NAMES[i], which lets the set still open
+# around a timetable be updated per added course instead of rescanning.
+class Offerings:
+    def __init__(self, rows, catalog=None):
+        self.rows = rows  # one dict per offering, in COURSE_FIELDS form
+        self.masks = [slots_to_mask(parse_slots(row["slots"])) for row in rows]
+        self.all = (1 << len(rows)) - 1
+        self.by_course = {}  # course_code -> offering bitset
+        self.by_faculty = {}  # clean_name(faculty) -> offering bitset
+        self.by_slot = [0] * len(SLOT_NAMES)  # slot bit -> offerings that use the slot
+        self.by_mask = {}  # slot mask -> offerings with exactly those slots
+        for i, (row, mask) in enumerate(zip(rows, self.masks)):
+            bit = 1 << i
+            self.by_course[row["course_code"]] = self.by_course.get(row["course_code"], 0) | bit
+            key = clean_name(row["faculty"])
+            self.by_faculty[key] = self.by_faculty.get(key, 0) | bit
+            self.by_mask[mask] = self.by_mask.get(mask, 0) | bit
+            for slot in bits(mask):
+                self.by_slot[slot] |= bit
+        self.slot_clash = self._slot_clashes()
+        # Catalog id of each offering's teacher, or None when SCOPE.txt has no such name
+        positions = {name: i for i, name in enumerate(catalog.normalized)} if catalog is not None else {}
+        self.teacher_ids = [
+            catalog.ids[positions[clean_name(row["faculty"])]] if clean_name(row["faculty"]) in positions else None
+            for row in rows
+        ]
+
+    def __len__(self):
+        return len(self.rows)
+
+    def _slot_clashes(self):
+        # Offerings share a handful of slot combinations, so clashes are worked
+        # out once per combination rather than once per offering
+        combos = [(clash_engine.slots_mask(mask_to_slots(mask)), offerings) for mask, offerings in self.by_mask.items()]
+        clashes = []
+        for slot in SLOT_NAMES:
+            slot_time, slot_cell = clash_engine.time_masks[slot], clash_engine.cell_masks[slot]
+            clashing = 0
+            for (time_mask, cell_mask), offerings in combos:
+                if time_mask & slot_time or cell_mask & slot_cell:
+                    clashing |= offerings
+            clashes.append(clashing)
+        return clashes
+
+    def ids(self, offerings):
+        return list(bits(offerings))
+
+    def courses(self, offerings=None):
+        # Course codes with at least one offering in the set
+        offerings = self.all if offerings is None else offerings
+        return sorted(code for code, course in self.by_course.items() if course & offerings)
+
+    def for_course(self, course_code, offerings=None):
+        offerings = self.all if offerings is None else offerings
+        return self.ids(self.by_course.get(course_code, 0) & offerings)
+
+    def blocked(self, slot_mask):
+        # Offerings that clash with any slot in slot_mask
+        clashing = 0
+        for slot in bits(slot_mask):
+            clashing |= self.slot_clash[slot]
+        return clashing
+
+    def narrow(self, available, rows):
+        # available after adding plan rows (course_code, ..., slot_mask): drops
+        # offerings that clash with them and other offerings of the same courses
+        for row in rows:
+            available &= ~(self.by_course.get(row[0], 0) | self.blocked(row[4]))
+        return available
+
+
+def read_offerings(path):
+    # (rows, rejected): rows in COURSE_FIELDS form, and (line number, reason)
+    # for each CSV line that was skipped. Header names are matched case-insensitively.
+    rows, rejected, seen = [], [], set()
+    with open(path, "r", newline="", encoding="utf-8-sig") as f:
+        reader = csv.DictReader(f)
+        for record in reader:
+            record = {(key or "").strip().lower(): (value or "").strip() for key, value in record.items()}
+            row = {field: record.get(field, "") for field in COURSE_FIELDS}
+            row["course_code"] = row["course_code"].upper()
+            slots = parse_slots(row["slots"])
+            if not row["course_code"] or not slots:
+                rejected.append((reader.line_num, "Course code and slots are required."))
+                continue
+            problems = clash_engine.check(slots)
+            if problems:
+                rejected.append((reader.line_num, " ".join(describe_problems(problems))))
+                continue
+            row["slots"] = "+".join(slots)
+            key = (row["course_code"], clean_name(row["faculty"]), slots_to_mask(slots))
+            if key in seen:
+                rejected.append((reader.line_num, "Duplicate offering."))
+                continue
+            seen.add(key)
+            rows.append(row)
+    return rows, rejected
+
+
+def load_offerings(path=DEFAULT_SOURCE, catalog=None):
+    rows, rejected = read_offerings(path)
+    return Offerings(rows, catalog), rejected
+
+
+if __name__ == "__main__":
+    source = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_SOURCE
+    offerings, rejected = load_offerings(source)
+    for line, reason in rejected:
+        print(f"{source}:{line}: {reason}")
+    print(f"Loaded {len(offerings)} offerings of {len(offerings.by_course)} courses from {source}, skipped {len(rejected)}")
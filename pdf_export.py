@@ -0,0 +1,250 @@
+import io
+import os
+import sys
+import time
+import tracemalloc
+import zipfile
+
+from fpdf import FPDF
+
+from timetable import days, timetableData, theory_times, lab_times
+
+# First existing TTF wins; without one we fall back to core Arial (Latin-1 only)
+FONT_CANDIDATES = [
+    os.environ.get("FFCS_PDF_FONT", ""),
+    "fonts/DejaVuSans.ttf",
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+    "/usr/share/fonts/dejavu/DejaVuSans.ttf",
+    "/Library/Fonts/Arial Unicode.ttf",
+    "C:/Windows/Fonts/arial.ttf",
+]
+TITLE = "FFCS Faculty Timetable"
+
+# Page geometry (mm, A4 landscape)
+MARGIN = 10
+N_COLS = len(theory_times)
+CELL_W = (297 - 2 * MARGIN) / (N_COLS + 1)  # +1 for DAY column
+CELL_H = 14  # Slightly taller for readability
+GRID_TOP = 22  # below the title line
+DAYS_TOP = GRID_TOP + 2 * CELL_H  # below the theory and lab header rows
+LIST_HEADERS = ["Course Code", "Course Name", "Faculty", "Slots", "Room"]
+LIST_WIDTHS = [30, 45, 45, 45, 30]
+
+
+def find_unicode_font():
+    for path in FONT_CANDIDATES:
+        if path and os.path.exists(path):
+            return path
+    return None
+
+
+def _header_text(header):
+    if 'to' in header:
+        t1, t2 = header.split(' to ')
+        return f"{t1.strip()}\nto\n{t2.strip()}"
+    return header
+
+
+# Renders timetables onto A4 pages. The title-less grid (time headers, day
+# column, empty and lunch cells) is drawn once into a scratch document and its
+# page content stream is reused as a template, so each timetable only draws
+# its title, occupied cells and faculty list on top of it.
+class TimetablePDF:
+    def __init__(self, font_path=None):
+        self.font_path = font_path if font_path is not None else find_unicode_font()
+        self.family = "DejaVu" if self.font_path else "Arial"
+        self._template = None
+
+    def new_document(self):
+        # Fonts must be registered in the same order everywhere so the
+        # template's /F1 reference means the same font in every document
+        pdf = FPDF(orientation='L', unit='mm', format='A4')
+        if self.font_path:
+            pdf.add_font(self.family, '', self.font_path, uni=True)
+        return pdf
+
+    def text(self, value):
+        value = str(value)
+        if self.font_path:
+            return value
+        return value.encode("latin-1", "replace").decode("latin-1")
+
+    def _draw_grid(self, pdf):
+        pdf.set_font(self.family, size=6)
+        # --- Header: Theory times ---
+        pdf.set_xy(MARGIN, GRID_TOP)
+        pdf.set_fill_color(235, 235, 235)  # Very light gray for DAY header
+        pdf.cell(CELL_W, CELL_H, "DAY", border=1, align='C', fill=True)
+        pdf.set_fill_color(191, 202, 252)  # Light blue for theory header
+        for header in theory_times:
+            x, y = pdf.get_x(), pdf.get_y()
+            pdf.multi_cell(CELL_W, CELL_H / 3, _header_text(header), border=1, align='C', fill=True)
+            pdf.set_xy(x + CELL_W, y)
+        # --- Header: Lab times ---
+        pdf.set_xy(MARGIN, GRID_TOP + CELL_H)
+        pdf.set_fill_color(220, 230, 250)  # Lighter blue for lab header
+        pdf.cell(CELL_W, CELL_H, "", border=1, align='C', fill=True)
+        for header in lab_times:
+            x, y = pdf.get_x(), pdf.get_y()
+            pdf.multi_cell(CELL_W, CELL_H / 3, _header_text(header), border=1, align='C', fill=True)
+            pdf.set_xy(x + CELL_W, y)
+        # --- Empty rows for each day ---
+        pdf.set_font(self.family, size=7)
+        for row, day in enumerate(days):
+            pdf.set_xy(MARGIN, DAYS_TOP + row * CELL_H)
+            pdf.set_fill_color(235, 235, 235)  # Very light gray for day cells
+            pdf.cell(CELL_W, CELL_H, day, border=1, align='C', fill=True)
+            for period in range(N_COLS):
+                slot_label = _slot_label(day, period)
+                if not slot_label:
+                    pdf.set_fill_color(235, 235, 235)  # Very light gray for lunch
+                    pdf.cell(CELL_W, CELL_H, "LUNCH", border=1, align='C', fill=True)
+                else:
+                    pdf.set_fill_color(255, 255, 255)  # White for empty cells
+                    pdf.cell(CELL_W, CELL_H, slot_label, border=1, align='C', fill=True)
+
+    def template(self):
+        # (page content stream, glyphs the template uses from the unicode font)
+        if self._template is None:
+            pdf = self.new_document()
+            pdf.add_page()
+            self._draw_grid(pdf)
+            subset = list(pdf.current_font.get('subset', [])) if self.font_path else []
+            self._template = (pdf.pages[1], subset)
+        return self._template
+
+    def add_timetable(self, pdf, timetable, cell_is_lab, faculty_list, title=TITLE):
+        content, subset = self.template()
+        pdf.add_page()
+        pdf.pages[pdf.page] += content
+        if self.font_path:
+            font = pdf.fonts[self.family.lower()]
+            known = set(font['subset'])
+            font['subset'].extend(code for code in subset if code not in known)
+        # The template switched fonts and colours behind FPDF's back
+        pdf.font_family = ''
+        pdf.set_font(self.family, size=10)
+        pdf.set_xy(MARGIN, 10)
+        pdf.cell(0, 10, self.text(title), ln=True, align="C")
+        # --- Occupied cells ---
+        pdf.set_font(self.family, size=7)
+        for row, day in enumerate(days):
+            for period in range(N_COLS):
+                entry = timetable.get((day, period))
+                slot_label = _slot_label(day, period)
+                if not entry or not slot_label:
+                    continue
+                if cell_is_lab.get((day, period), False):
+                    pdf.set_fill_color(231, 76, 60)
+                else:
+                    pdf.set_fill_color(46, 204, 64)
+                # Only show course code and room number
+                lines = f'{slot_label}\n{entry["course_code"]}\n{entry["room"]}'.split('\n')
+                if len(lines) > 3:
+                    lines = lines[:3]
+                    lines[-1] = lines[-1][:12] + '...' if len(lines[-1]) > 12 else lines[-1]
+                pdf.set_xy(MARGIN + CELL_W * (period + 1), DAYS_TOP + row * CELL_H)
+                pdf.multi_cell(CELL_W, CELL_H / 3, self.text('\n'.join(lines)), border=1, align='C', fill=True)
+        # --- Faculty List Table ---
+        pdf.set_y(DAYS_TOP + len(days) * CELL_H)
+        pdf.ln(5)
+        pdf.set_font(self.family, size=8)
+        pdf.set_x(MARGIN)
+        pdf.cell(0, 8, "Faculty List", ln=True, align="L")
+        pdf.set_x(MARGIN)
+        pdf.set_fill_color(191, 202, 252)
+        for header, width in zip(LIST_HEADERS, LIST_WIDTHS):
+            pdf.cell(width, 8, header, border=1, align='C', fill=True)
+        pdf.ln(8)
+        pdf.set_fill_color(255, 255, 255)
+        for entry in faculty_list:
+            pdf.set_x(MARGIN)
+            for key, width in zip(["course_code", "course_name", "faculty", "slots", "room"], LIST_WIDTHS):
+                pdf.cell(width, 8, self.text(entry.get(key, "")), border=1, align='C', fill=True)
+            pdf.ln(8)
+
+    def render(self, timetable, cell_is_lab, faculty_list, title=TITLE):
+        pdf = self.new_document()
+        self.add_timetable(pdf, timetable, cell_is_lab, faculty_list, title)
+        return _output(pdf)
+
+    def render_many(self, items):
+        # One multi-page document; items are dicts with timetable, cell_is_lab,
+        # faculty_list and optionally title
+        pdf = self.new_document()
+        for item in items:
+            self.add_timetable(pdf, item["timetable"], item["cell_is_lab"], item["faculty_list"], item.get("title", TITLE))
+        return _output(pdf)
+
+
+def _slot_label(day, period):
+    slots = timetableData[day][period] if period < len(timetableData[day]) else []
+    return " / ".join([s for s in slots if s])
+
+
+def _output(pdf):
+    return pdf.output(dest="S").encode("latin1")
+
+
+def export_zip(items, renderer):
+    # Each timetable as its own PDF, zipped. Rendered in-process: a page is a
+    # few milliseconds from the cached template, less than starting a worker.
+    out = io.BytesIO()
+    with zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED) as archive:
+        for i, item in enumerate(items):
+            data = renderer.render(item["timetable"], item["cell_is_lab"], item["faculty_list"], item.get("title", TITLE))
+            archive.writestr(f"timetable_{i + 1}.pdf", data)
+    return out.getvalue()
+
+
+def sample_item(courses=8, title=TITLE):
+    # A filled-in timetable for benchmarks: the first `courses` theory slot pairs
+    from timetable import clash_engine, SlotState
+    state = SlotState()
+    timetable, cell_is_lab, faculty_list = {}, {}, []
+    pairs = [("A1", "TA1"), ("B1", "TB1"), ("C1", "TC1"), ("D1", "TD1"), ("E1", "TE1"), ("F1", "TF1"),
+             ("G1", "TG1"), ("A2", "TA2"), ("B2", "TB2"), ("C2", "TC2"), ("D2", "TD2"), ("E2", "TE2")]
+    for i, pair in enumerate(pairs[:courses]):
+        slots = list(pair)
+        if clash_engine.check(slots, state):
+            continue
+        entry = {"course_code": f"CSE{1001 + i}", "course_name": f"Course {i + 1}",
+                 "faculty": "Dr. Çelik Ñúñez", "slots": "+".join(slots), "room": f"SJT{101 + i}"}
+        clash_engine.add(state, slots, i)
+        for cell, is_lab in clash_engine.cell_kinds(slots).items():
+            timetable[cell] = entry
+            cell_is_lab[cell] = is_lab
+        faculty_list.append(entry)
+    return {"timetable": timetable, "cell_is_lab": cell_is_lab, "faculty_list": faculty_list, "title": title}
+
+
+def benchmark(pages=50, font_path=None):
+    # Time and peak traced memory per page for single and batched exports
+    renderer = TimetablePDF(font_path)
+    renderer.template()
+    item = sample_item()
+    results = {}
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    for _ in range(pages):
+        renderer.render(item["timetable"], item["cell_is_lab"], item["faculty_list"])
+    elapsed = time.perf_counter() - started
+    results["single"] = {"seconds_per_page": elapsed / pages, "peak_bytes": tracemalloc.get_traced_memory()[1]}
+    tracemalloc.reset_peak()
+
+    started = time.perf_counter()
+    data = renderer.render_many([item] * pages)
+    elapsed = time.perf_counter() - started
+    results["batch"] = {"seconds_per_page": elapsed / pages, "peak_bytes": tracemalloc.get_traced_memory()[1],
+                        "peak_bytes_per_page": tracemalloc.get_traced_memory()[1] / pages, "pdf_bytes": len(data)}
+    tracemalloc.stop()
+    results["unicode_font"] = renderer.font_path
+    return results
+
+
+if __name__ == "__main__":
+    # python pdf_export.py [pages]
+    pages = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    for name, value in benchmark(pages).items():
+        print(f"{name}: {value}")
@@ -0,0 +1,143 @@
+import base64
+import binascii
+import hashlib
+import json
+import threading
+import time
+import zlib
+
+import db
+from timetable import clash_engine, parse_slots, slot_to_cells, SlotState
+
+TOKEN_VERSION = 1
+# Bit i of a course's slot mask is SLOT_NAMES[i]; tokens depend on this order
+SLOT_NAMES = sorted(slot_to_cells)
+SLOT_BIT = {slot: 1 << i for i, slot in enumerate(SLOT_NAMES)}
+COURSE_FIELDS = ["course_code", "course_name", "faculty", "slots", "room"]
+
+
+def slots_to_mask(slots):
+    mask = 0
+    for slot in slots:
+        mask |= SLOT_BIT[slot]
+    return mask
+
+
+def mask_to_slots(mask):
+    return [slot for i, slot in enumerate(SLOT_NAMES) if mask >> i & 1]
+
+
+# A planned timetable, normalized: one row per course with its slots as a
+# bitmask over SLOT_NAMES. The per-cell view used for rendering points at the
+# course rows instead of holding copies, and the whole plan round-trips through
+# a short URL-safe token.
+class Plan:
+    def __init__(self):
+        self.rows = []  # (course_code, course_name, faculty, room, slot_mask)
+        self.faculty_list = []  # one dict per row, in COURSE_FIELDS form
+        self.timetable = {}  # (day, period) -> faculty_list entry
+        self.cell_is_lab = {}  # (day, period) -> whether a lab slot fills it
+        self.slot_state = SlotState()
+
+    def __len__(self):
+        return len(self.rows)
+
+    def add(self, entry):
+        # Caller has already checked the slots for clashes
+        slots = [slot for slot in parse_slots(entry["slots"]) if slot in SLOT_BIT]
+        mask = slots_to_mask(slots)
+        self._append((entry["course_code"], entry.get("course_name", ""), entry["faculty"], entry["room"], mask))
+
+    def _append(self, row):
+        course_code, course_name, faculty, room, mask = row
+        slots = mask_to_slots(mask)
+        entry = {"course_code": course_code, "course_name": course_name, "faculty": faculty,
+                 "slots": "+".join(slots), "room": room}
+        clash_engine.add(self.slot_state, slots, len(self.rows))
+        for cell, is_lab in clash_engine.cell_kinds(slots).items():
+            self.timetable[cell] = entry
+            self.cell_is_lab[cell] = is_lab
+        self.rows.append(row)
+        self.faculty_list.append(entry)
+
+    def encode(self):
+        rows = [[code, name, faculty, room, format(mask, "x")] for code, name, faculty, room, mask in self.rows]
+        data = json.dumps([TOKEN_VERSION, rows], separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+        return base64.urlsafe_b64encode(zlib.compress(data, 9)).decode("ascii").rstrip("=")
+
+    @classmethod
+    def decode(cls, token):
+        # Raises ValueError for anything that is not a valid, clash-free plan.
+        # Each row's own slots get the full clash check; rows are checked
+        # against each other with one AND per row.
+        try:
+            data = zlib.decompress(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+            version, rows = json.loads(data.decode("utf-8"))
+            rows = [(str(code), str(name), str(faculty), str(room), int(mask, 16)) for code, name, faculty, room, mask in rows]
+        except (binascii.Error, zlib.error, UnicodeDecodeError, TypeError, ValueError) as e:
+            raise ValueError(f"Not a timetable token: {e}") from e
+        if version != TOKEN_VERSION:
+            raise ValueError(f"Unsupported timetable token version {version}")
+        plan = cls()
+        for row in rows:
+            mask = row[4]
+            if mask <= 0 or mask >> len(SLOT_NAMES):
+                raise ValueError(f"Bad slot mask for {row[0]}")
+            slots = mask_to_slots(mask)
+            if clash_engine.check(slots):
+                raise ValueError(f"The slots of {row[0]} clash with each other")
+            time_mask, cell_mask = clash_engine.slots_mask(slots)
+            if time_mask & plan.slot_state.time_mask or cell_mask & plan.slot_state.cell_mask:
+                raise ValueError(f"{row[0]} clashes with another course in the timetable")
+            plan._append(row)
+        return plan
+
+
+def diff_plans(old, new):
+    # (added, removed) faculty_list entries going from old to new
+    old_rows, new_rows = set(old.rows), set(new.rows)
+    added = [entry for row, entry in zip(new.rows, new.faculty_list) if row not in old_rows]
+    removed = [entry for row, entry in zip(old.rows, old.faculty_list) if row not in new_rows]
+    return added, removed
+
+
+def plan_id(token):
+    # Content-addressed, so saving the same timetable twice gives the same id
+    return base64.b32encode(hashlib.sha256(token.encode("ascii")).digest()[:5]).decode("ascii").lower()
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS plans (
+    id TEXT PRIMARY KEY,
+    token TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+"""
+
+
+# Saved timetables by id, so links can stay short
+class PlanStore:
+    def __init__(self, path="timetables.db"):
+        self.path = path
+        self.conn = db.connect(path, SCHEMA)
+        self._lock = threading.Lock()
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+    def save(self, plan):
+        token = plan.encode()
+        saved_id = plan_id(token)
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT OR IGNORE INTO plans (id, token, created_at) VALUES (?, ?, ?)",
+                (saved_id, token, time.time()),
+            )
+        return saved_id
+
+    def load(self, saved_id):
+        # Plan for saved_id, or None when there is no such id
+        with self._lock:
+            row = self.conn.execute("SELECT token FROM plans WHERE id = ?", (saved_id.strip().lower(),)).fetchone()
+        return Plan.decode(row[0]) if row else None
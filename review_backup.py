@@ -0,0 +1,301 @@
+import argparse
+import csv
+import hashlib
+import json
+import os
+import sys
+import time
+from collections import Counter
+
+from atomic import atomic_write
+from review_store import DB_COLUMNS, ReviewStore
+from reviews import COMMENT_COL, SCORE_COLS, TEACHER_COL, clean_name
+
+BATCH_SIZE = 1000
+HERE = os.path.dirname(os.path.abspath(__file__))
+MAX_COMMENT_LENGTH = 100  # as enforced by the review form
+# Accepted input headers: the backup's own column names or the sheet's
+COLUMN_ALIASES = {column: column for column in DB_COLUMNS}
+COLUMN_ALIASES.update({TEACHER_COL.strip().lower(): "teacher", COMMENT_COL.strip().lower(): "comment"})
+COLUMN_ALIASES.update({col.strip().lower(): key for key, col in SCORE_COLS.items()})
+CRITERIA_COLUMNS = ["teaching", "leniency", "correction", "da_quiz"]
+
+
+def backup_format(path, requested=None):
+    if requested:
+        return requested
+    return "jsonl" if path.endswith((".jsonl", ".json")) else "csv"
+
+
+# --- Export ---
+def export_reviews(rows, out, fmt="csv"):
+    # Streams rows (sheet column order) to the open text file out; returns the count
+    count = 0
+    writer = csv.writer(out) if fmt == "csv" else None
+    if writer is not None:
+        writer.writerow(DB_COLUMNS)
+    for row in rows:
+        if writer is not None:
+            writer.writerow(row)
+        else:
+            out.write(json.dumps(dict(zip(DB_COLUMNS, row)), ensure_ascii=False) + "\n")
+        count += 1
+    return count
+
+
+# --- Import ---
+def read_backup(f, fmt="csv"):
+    # Yields (position, record) with keys mapped through COLUMN_ALIASES;
+    # position is the CSV line or JSONL line number
+    if fmt == "csv":
+        reader = csv.DictReader(f)
+        for record in reader:
+            yield reader.line_num, {COLUMN_ALIASES.get((key or "").strip().lower(), key): value for key, value in record.items()}
+        return
+    for line_number, line in enumerate(f, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            record = None
+        if not isinstance(record, dict):
+            yield line_number, None
+            continue
+        yield line_number, {COLUMN_ALIASES.get(str(key).strip().lower(), key): value for key, value in record.items()}
+
+
+def _score(value):
+    score = float(value)
+    if not 0 <= score <= 10:
+        raise ValueError
+    return int(score) if score.is_integer() else score
+
+
+def normalize_record(record, canonical_names=None):
+    # Sheet-order row for a backup record, or raises ValueError saying why not.
+    # Teacher names are matched by clean_name to their catalog spelling when
+    # canonical_names is given; overall is recomputed when missing.
+    if record is None:
+        raise ValueError("Not a JSON object.")
+    teacher = " ".join(str(record.get("teacher") or "").split())
+    if not teacher:
+        raise ValueError("Teacher is required.")
+    if canonical_names is not None:
+        teacher = canonical_names.get(clean_name(teacher), teacher)
+    try:
+        scores = [_score(record.get(column)) for column in CRITERIA_COLUMNS]
+    except (TypeError, ValueError):
+        raise ValueError("Scores must be numbers from 0 to 10.") from None
+    overall = record.get("overall")
+    try:
+        overall = _score(overall) if overall not in (None, "") else sum(scores) / len(scores)
+    except (TypeError, ValueError):
+        raise ValueError("Overall rating must be a number from 0 to 10.") from None
+    comment = str(record.get("comment") or "").strip()
+    if len(comment) > MAX_COMMENT_LENGTH:
+        raise ValueError(f"Comment is longer than {MAX_COMMENT_LENGTH} characters.")
+    return [teacher] + scores + [overall, comment]
+
+
+def _digest_score(value):
+    try:
+        return f"{float(value):g}"
+    except (TypeError, ValueError):
+        return str(value).strip()
+
+
+def review_digest(row):
+    # 64-bit content hash; the same review restored twice hashes the same,
+    # whether its scores come back as numbers or strings
+    teacher, *scores, comment = row
+    data = "\x1f".join([clean_name(str(teacher))] + [_digest_score(s) for s in scores] + [str(comment).strip()])
+    return int.from_bytes(hashlib.sha1(data.encode("utf-8")).digest()[:8], "big")
+
+
+# --- Checkpoints ---
+# A checkpoint records how many input records are already handled, so an
+# interrupted import resumes after the last written batch. It only applies to
+# the same input file (path, size and mtime) and target.
+def source_signature(path, target):
+    stat = os.stat(path)
+    return {"source": os.path.abspath(path), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "target": target}
+
+
+def read_checkpoint(path, signature):
+    try:
+        with open(path, "r") as f:
+            checkpoint = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if any(checkpoint.get(key) != value for key, value in signature.items()):
+        return None
+    return checkpoint
+
+
+def write_checkpoint(path, checkpoint):
+    with atomic_write(path) as f:
+        json.dump(checkpoint, f)
+
+
+# --- Targets ---
+# A target takes validated rows in batches and counts the digests of the
+# reviews it already holds
+class StoreTarget:
+    def __init__(self, store):
+        self.store = store
+
+    def digests(self):
+        return Counter(review_digest(row) for row in self.store.iter_rows())
+
+    def write(self, rows):
+        self.store.add_many(rows)
+
+
+class SheetTarget:
+    def __init__(self, sheet, retries=5):
+        self.sheet = sheet
+        self.retries = retries
+
+    def digests(self):
+        values = self.sheet.get_all_values()
+        width = len(DB_COLUMNS)
+        return Counter(review_digest((list(row) + [""] * width)[:width]) for row in values[1:] if any(row))
+
+    def write(self, rows):
+        # One append_rows call per batch, backing off on quota errors (HTTP 429)
+        from gspread.exceptions import APIError
+
+        for attempt in range(self.retries):
+            try:
+                self.sheet.append_rows(rows)
+                return
+            except APIError as e:
+                if e.response.status_code != 429 or attempt == self.retries - 1:
+                    raise
+                time.sleep(2 ** attempt * 5)
+
+
+def import_reviews(records, target, checkpoint_path=None, signature=None, batch_size=BATCH_SIZE,
+                   canonical_names=None, progress=None):
+    # Validates, dedups and writes records from read_backup to target in
+    # batches, checkpointing after each one. Returns the import stats;
+    # stats["rejected"] lists (position, reason) for skipped records.
+    checkpoint = read_checkpoint(checkpoint_path, signature) if checkpoint_path else None
+    stats = {"records": 0, "imported": 0, "duplicates": 0, "rejected": []}
+    if checkpoint is not None:
+        stats.update({key: checkpoint[key] for key in ("records", "imported", "duplicates")})
+        stats["rejected"] = [tuple(item) for item in checkpoint["rejected"]]
+    skip = stats["records"]
+    seen = target.digests()
+    batch = []
+
+    def flush():
+        if batch:
+            target.write(batch)
+            stats["imported"] += len(batch)
+            batch.clear()
+        if checkpoint_path:
+            write_checkpoint(checkpoint_path, dict(signature or {}, **stats))
+        if progress:
+            progress(stats)
+
+    # A record is a duplicate only while the target still holds an unmatched
+    # copy of it: two identical reviews in the file are both kept unless the
+    # target already has two. On resume, the records before the checkpoint
+    # are replayed against the counts (each was either matched or imported),
+    # which leaves them where the interrupted run had them.
+    for i, (position, record) in enumerate(records):
+        try:
+            row = normalize_record(record, canonical_names)
+        except ValueError as e:
+            if i >= skip:
+                stats["rejected"].append((position, str(e)))
+        else:
+            digest = review_digest(row)
+            if seen[digest] > 0:
+                seen[digest] -= 1
+                if i >= skip:
+                    stats["duplicates"] += 1
+            elif i >= skip:
+                batch.append(row)
+        if i < skip:
+            continue
+        stats["records"] = i + 1
+        if len(batch) >= batch_size:
+            flush()
+    flush()
+    if checkpoint_path:
+        try:
+            os.remove(checkpoint_path)
+        except OSError:
+            pass
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Back up or restore the review dataset as CSV or JSONL.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    export_parser = commands.add_parser("export", help="write every review in the local store to a file")
+    export_parser.add_argument("output", help="output file, or - for stdout")
+    import_parser = commands.add_parser("import", help="restore reviews from a backup file")
+    import_parser.add_argument("input")
+    import_parser.add_argument("--target", choices=["store", "sheet"], required=True,
+                               help="the local store (replicated to the sheet by the running app) or the Google Sheet itself")
+    import_parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    import_parser.add_argument("--checkpoint", help="checkpoint file (default: <input>.checkpoint)")
+    import_parser.add_argument("--no-catalog", action="store_true", help="keep teacher names as written instead of the SCOPE.txt spelling")
+    for command in (export_parser, import_parser):
+        command.add_argument("--format", choices=["csv", "jsonl"], help="default: from the file extension")
+        command.add_argument("--db", default=os.environ.get("REVIEW_DB_PATH", "reviews.db"))
+    args = parser.parse_args(argv)
+
+    if args.command == "export":
+        store = ReviewStore(args.db)
+        fmt = backup_format(args.output, args.format)
+        if args.output == "-":
+            count = export_reviews(store.iter_rows(), sys.stdout, fmt)
+        else:
+            with atomic_write(args.output, newline="", encoding="utf-8") as f:
+                count = export_reviews(store.iter_rows(), f, fmt)
+        print(f"Exported {count} reviews", file=sys.stderr)
+        return 0
+
+    if args.target == "sheet":
+        from app_resources import get_google_sheet
+        target = SheetTarget(get_google_sheet())
+    else:
+        target = StoreTarget(ReviewStore(args.db))
+    canonical_names = None
+    if not args.no_catalog:
+        from catalog import load_catalog
+        try:
+            catalog = load_catalog(os.path.join(HERE, "SCOPE.txt"), os.path.join(HERE, "faculty_catalog.json"))
+        except OSError as e:
+            parser.error(f"cannot read the faculty catalog ({e}); pass --no-catalog to keep names as written")
+        canonical_names = dict(zip(catalog.normalized, catalog.names))
+
+    def progress(stats):
+        print(f"\r{stats['records']} read, {stats['imported']} imported, {stats['duplicates']} duplicates, "
+              f"{len(stats['rejected'])} rejected", end="", file=sys.stderr)
+
+    fmt = backup_format(args.input, args.format)
+    with open(args.input, "r", newline="", encoding="utf-8-sig") as f:
+        stats = import_reviews(
+            read_backup(f, fmt), target,
+            checkpoint_path=args.checkpoint or f"{args.input}.checkpoint",
+            signature=source_signature(args.input, args.target),
+            batch_size=args.batch_size,
+            canonical_names=canonical_names,
+            progress=progress,
+        )
+    print(file=sys.stderr)
+    for position, reason in stats["rejected"]:
+        print(f"{args.input}:{position}: {reason}", file=sys.stderr)
+    print(f"Imported {stats['imported']} of {stats['records']} records: {stats['duplicates']} already present, "
+          f"{len(stats['rejected'])} rejected", file=sys.stderr)
+    return 1 if stats["rejected"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,67 @@
+import math
+import time
+import zipfile
+
+import numpy as np
+
+from atomic import atomic_write
+from reviews import COMMENT_COL, SCORE_COLS, SHEET_COLUMNS, TEACHER_COL
+
+SNAPSHOT_FORMAT = 1
+SCORE_COLUMNS = list(SCORE_COLS.values())
+
+
+def _score(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan  # blank or non-numeric cell
+
+
+def _cell(value):
+    # Back to what numericise_all gave for the sheet cell: int, float or ""
+    if math.isnan(value):
+        return ""
+    return int(value) if value.is_integer() else value
+
+
+def write_snapshot(path, records):
+    # Columnar copy of the review records: teacher names and comments are
+    # stored once each in a string table plus an int32 code per review, and
+    # the scores as one float matrix. Written to a temp file, then swapped in.
+    teachers, teacher_codes = np.unique(np.array([str(r.get(TEACHER_COL, "")) for r in records], dtype=str), return_inverse=True)
+    comments, comment_codes = np.unique(np.array([str(r.get(COMMENT_COL, "")) for r in records], dtype=str), return_inverse=True)
+    scores = np.array([[_score(r.get(col, "")) for col in SCORE_COLUMNS] for r in records], dtype=float).reshape(len(records), len(SCORE_COLUMNS))
+    with atomic_write(path, "wb") as f:
+        np.savez(
+            f,
+            format=np.array(SNAPSHOT_FORMAT),
+            written_at=np.array(time.time()),
+            teachers=teachers,
+            teacher_codes=teacher_codes.astype(np.int32),
+            comments=comments,
+            comment_codes=comment_codes.astype(np.int32),
+            scores=scores,
+        )
+
+
+def read_snapshot(path):
+    # (records, written_at) in the same shape as ReviewStore.records(), or None
+    # when there is no usable snapshot
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            if int(data["format"]) != SNAPSHOT_FORMAT:
+                return None
+            teachers = data["teachers"].tolist()
+            comments = data["comments"].tolist()
+            teacher_codes = data["teacher_codes"].tolist()
+            comment_codes = data["comment_codes"].tolist()
+            scores = data["scores"].tolist()
+            written_at = float(data["written_at"])
+    except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+        return None
+    records = [
+        dict(zip(SHEET_COLUMNS, [teachers[t], *map(_cell, row), comments[c]]))
+        for t, row, c in zip(teacher_codes, scores, comment_codes)
+    ]
+    return records, written_at
@@ -0,0 +1,255 @@
+import logging
+import re
+import threading
+import time
+
+import db
+from review_snapshot import write_snapshot
+from reviews import SHEET_COLUMNS, TEACHER_COL, clean_name
+from sheet_sync import ReviewSync
+from submit_queue import SubmissionQueue
+
+logger = logging.getLogger(__name__)
+
+DB_COLUMNS = ["teacher", "teaching", "leniency", "correction", "da_quiz", "overall", "comment"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS reviews (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    teacher TEXT NOT NULL,
+    teacher_key TEXT NOT NULL,
+    teaching NUMERIC,
+    leniency NUMERIC,
+    correction NUMERIC,
+    da_quiz NUMERIC,
+    overall NUMERIC,
+    comment TEXT,
+    sheet_row INTEGER,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS reviews_teacher_key ON reviews (teacher_key);
+CREATE UNIQUE INDEX IF NOT EXISTS reviews_sheet_row ON reviews (sheet_row);
+"""
+
+
+# Local review store. Rows with sheet_row set mirror that row of the Google Sheet;
+# rows with sheet_row NULL were written locally and are waiting to be replicated.
+class ReviewStore:
+    def __init__(self, path="reviews.db"):
+        self.path = path
+        self.conn = db.connect(path, SCHEMA)
+        self.version = 0
+        self._lock = threading.Lock()
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+    def add(self, row):
+        # row is in sheet column order: [teacher, teaching, leniency, correction, da_quiz, overall, comment]
+        with self._lock, self.conn:
+            cur = self.conn.execute(
+                f"INSERT INTO reviews ({', '.join(DB_COLUMNS)}, teacher_key, created_at) "
+                f"VALUES ({', '.join('?' * len(DB_COLUMNS))}, ?, ?)",
+                list(row) + [clean_name(str(row[0])), time.time()],
+            )
+            self.version += 1
+            return cur.lastrowid
+
+    def add_many(self, rows):
+        # Bulk version of add, in one transaction; rows wait to be replicated like any local write
+        now = time.time()
+        with self._lock, self.conn:
+            self.conn.executemany(
+                f"INSERT INTO reviews ({', '.join(DB_COLUMNS)}, teacher_key, created_at) "
+                f"VALUES ({', '.join('?' * len(DB_COLUMNS))}, ?, ?)",
+                [list(row) + [clean_name(str(row[0])), now] for row in rows],
+            )
+            self.version += 1
+
+    def iter_rows(self, chunk_size=1000):
+        # Every review in sheet column order, read chunk_size rows at a time by id
+        last_id = 0
+        while True:
+            with self._lock:
+                chunk = self.conn.execute(
+                    f"SELECT id, {', '.join(DB_COLUMNS)} FROM reviews WHERE id > ? ORDER BY id LIMIT ?",
+                    (last_id, chunk_size),
+                ).fetchall()
+            if not chunk:
+                return
+            for row in chunk:
+                yield list(row[1:])
+            last_id = chunk[-1][0]
+
+    def records(self):
+        with self._lock:
+            rows = self.conn.execute(
+                f"SELECT {', '.join(DB_COLUMNS)} FROM reviews "
+                "ORDER BY sheet_row IS NULL, sheet_row, id"
+            ).fetchall()
+        return [dict(zip(SHEET_COLUMNS, row)) for row in rows]
+
+    def count(self):
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM reviews").fetchone()[0]
+
+    def pending(self, limit=100):
+        with self._lock:
+            return self.conn.execute(
+                f"SELECT id, {', '.join(DB_COLUMNS)} FROM reviews WHERE sheet_row IS NULL ORDER BY id LIMIT ?",
+                (limit,),
+            ).fetchall()
+
+    def mark_replicated(self, ids, first_row):
+        with self._lock, self.conn:
+            for offset, review_id in enumerate(ids):
+                # Whatever is already mapped to that sheet row is stale; the next pull refills it
+                self.conn.execute("DELETE FROM reviews WHERE sheet_row = ?", (first_row + offset,))
+                self.conn.execute("UPDATE reviews SET sheet_row = ? WHERE id = ?", (first_row + offset, review_id))
+            self.version += 1
+
+    def apply_remote(self, records, start=0, full=False):
+        # records[i] is the sheet's data row start + i (sheet row start + i + 2)
+        with self._lock, self.conn:
+            if full:
+                self.conn.execute("DELETE FROM reviews WHERE sheet_row > ?", (start + len(records) + 1,))
+            now = time.time()
+            self.conn.executemany(
+                f"INSERT INTO reviews ({', '.join(DB_COLUMNS)}, teacher_key, sheet_row, created_at) "
+                f"VALUES ({', '.join('?' * len(DB_COLUMNS))}, ?, ?, ?) "
+                f"ON CONFLICT(sheet_row) DO UPDATE SET "
+                + ", ".join(f"{col} = excluded.{col}" for col in DB_COLUMNS + ["teacher_key"]),
+                [
+                    [record.get(col, "") for col in SHEET_COLUMNS]
+                    + [clean_name(str(record.get(TEACHER_COL, ""))), start + i + 2, now]
+                    for i, record in enumerate(records)
+                ],
+            )
+            self.version += 1
+
+
+def _first_updated_row(response):
+    # append_rows returns {"updates": {"updatedRange": "'Sheet1'!A12:G13", ...}}
+    try:
+        updated = response["updates"]["updatedRange"]
+    except (TypeError, KeyError):
+        return None
+    match = re.search(r"![A-Z]+(\d+)", updated)
+    return int(match.group(1)) if match else None
+
+
+# Background replicator: pulls remote edits/appends into the store through
+# ReviewSync and pushes locally written reviews to the sheet through a
+# SubmissionQueue, which coalesces them into append_rows batches.
+# With connect instead of sheet, the sheet is opened on the worker thread, so
+# startup never waits on Google. With snapshot_path, every pull that changes
+# the store saves the sheet's rows as a columnar snapshot (review_snapshot),
+# which can seed an empty store at the next start.
+class Replicator:
+    def __init__(self, store, sheet=None, interval=30, batch_size=50, max_wait=2.0, connect=None, snapshot_path=None):
+        self.store = store
+        self.sheet = sheet
+        self.connect = connect
+        self.snapshot_path = snapshot_path
+        self.interval = interval
+        self.last_pull = None  # time.time() of the last successful pull
+        self.sync = ReviewSync(sheet, min_interval=0)
+        self.queue = SubmissionQueue(self._flush_rows, max_batch=batch_size, max_wait=max_wait)
+        self._applied = 0
+        self._seen_version = 0
+        self._seen_full = 0
+        self._next_row = 0
+        self._sheet_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def submit(self, row):
+        # Local insert first, so the review is durable and readable immediately
+        review_id = self.store.add(row)
+        if self.sheet is not None:
+            self.queue.submit(review_id, (review_id, list(row)))
+        return review_id
+
+    def status(self, review_id):
+        return self.queue.status(review_id)
+
+    def pull(self):
+        with self._sheet_lock:
+            records = self.sync.refresh(force=True)
+            if self.sync.version == self._seen_version:
+                return 0
+            if self.sync.full_reloads != self._seen_full:
+                self.store.apply_remote(records, 0, full=True)
+                applied = len(records)
+            else:
+                self.store.apply_remote(records[self._applied:], self._applied)
+                applied = len(records) - self._applied
+            self._applied = len(records)
+            self._seen_version = self.sync.version
+            self._seen_full = self.sync.full_reloads
+            return applied
+
+    def push(self, limit=1000):
+        # Re-queue anything still pending locally, e.g. after a restart or a failed batch.
+        # Held under the lock _flush_rows holds from append_rows to mark_replicated,
+        # so a batch cannot land between reading pending() and checking the queue.
+        queued = 0
+        with self._sheet_lock:
+            for row in self.store.pending(limit):
+                if row[0] not in self.queue:
+                    self.queue.submit(row[0], (row[0], list(row[1:])))
+                    queued += 1
+        return queued
+
+    def _flush_rows(self, items):
+        with self._sheet_lock:
+            response = self.sheet.append_rows([row for _, row in items])
+            first_row = _first_updated_row(response) or max(self.sync.last_row + 1, self._next_row)
+            self.store.mark_replicated([review_id for review_id, _ in items], first_row)
+            self._next_row = first_row + len(items)
+
+    def ensure_sheet(self):
+        # Opens the sheet through connect if that has not worked yet
+        if self.sheet is None and self.connect is not None:
+            sheet = self.connect()
+            if sheet is not None:
+                with self._sheet_lock:
+                    self.sheet = sheet
+                    self.sync = ReviewSync(sheet, min_interval=0)
+        return self.sheet
+
+    def run_once(self):
+        if self.ensure_sheet() is None:
+            return
+        changed = self.pull()
+        self.last_pull = time.time()
+        if changed and self.snapshot_path:
+            try:
+                write_snapshot(self.snapshot_path, self.sync.records)
+            except OSError as e:
+                logger.warning("Could not write review snapshot %s: %s", self.snapshot_path, e)
+        self.push()
+
+    def start(self):
+        if self._thread is None and (self.sheet is not None or self.connect is not None):
+            self.queue.start()
+            self._thread = threading.Thread(target=self._run, name="review-replicator", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.queue.stop()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception:
+                # Quota errors and outages are expected; local reads keep working
+                logger.exception("Review replication failed")
+            self._stop.wait(self.interval)
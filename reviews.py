@@ -0,0 +1,69 @@
+import re
+
+# Column headers as they come back from the review sheet (some have trailing spaces)
+TEACHER_COL = 'Teacher '
+SCORE_COLS = {
+    "teaching": 'Teaching ',
+    "leniency": 'Leniency ',
+    "correction": 'Correction ',
+    "da_quiz": 'DA/Quiz ',
+    "overall": 'Overall Rating',
+}
+COMMENT_COL = 'Comment'
+# Sheet column order, as written by the submit path
+SHEET_COLUMNS = [TEACHER_COL] + list(SCORE_COLS.values()) + [COMMENT_COL]
+HISTOGRAM_BINS = 11  # overall ratings 0..10
+
+
+def clean_name(name):
+    return re.sub(r'^(dr|mr|ms)\s+', '', name.strip().lower())
+
+
+def to_score(value):
+    # Sheet cells can come back as int, float, numeric strings or ''
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def new_entry():
+    return {
+        "reviews": [],
+        "count": 0,
+        "sums": {key: 0.0 for key in SCORE_COLS},
+        "histogram": [0] * HISTOGRAM_BINS,
+    }
+
+
+def add_review(index, record):
+    # Adds one sheet record to the index, updating the running aggregates in place
+    key = clean_name(str(record.get(TEACHER_COL, '')))
+    entry = index.get(key)
+    if entry is None:
+        entry = index[key] = new_entry()
+    entry["reviews"].append(record)
+    entry["count"] += 1
+    for field, col in SCORE_COLS.items():
+        entry["sums"][field] += to_score(record.get(col, 0))
+    overall = to_score(record.get(SCORE_COLS["overall"], 0))
+    entry["histogram"][min(max(int(round(overall)), 0), HISTOGRAM_BINS - 1)] += 1
+    return entry
+
+
+def build_review_index(records):
+    # normalized teacher name -> {"reviews", "count", "sums", "histogram"}
+    index = {}
+    for record in records:
+        add_review(index, record)
+    return index
+
+
+def lookup(index, teacher_name):
+    return index.get(clean_name(teacher_name))
+
+
+def average(entry, field="overall"):
+    if not entry or not entry["count"]:
+        return 0
+    return min(entry["sums"][field] / entry["count"], 10)
@@ -0,0 +1,124 @@
+import bisect
+import heapq
+import re
+from collections import Counter, defaultdict
+from itertools import chain
+
+TITLE_RE = re.compile(r'^\s*(dr|mr|ms|mrs|prof)\b\.?\s*')
+NON_ALNUM_RE = re.compile(r'[^a-z0-9]+')
+MIN_SIMILARITY = 0.25
+
+
+def normalize(name):
+    # "Dr.Rajendran P" / "dr rajendran  p." -> "rajendran p"
+    name = TITLE_RE.sub('', name.lower())
+    return NON_ALNUM_RE.sub(' ', name).strip()
+
+
+def trigrams(text):
+    padded = f"$${text}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+# In-memory faculty search: a trigram inverted index over the space-free name
+# (tolerates typos and spacing differences) plus a sorted prefix array over
+# name tokens (fast completion for short queries and initials).
+class SearchIndex:
+    def __init__(self, names, normalized=None):
+        # normalized can be passed in precomputed (see catalog.py)
+        self.names = list(names)
+        self.normalized = list(normalized) if normalized is not None else [normalize(name) for name in self.names]
+        self.compact = [norm.replace(' ', '') for norm in self.normalized]
+        self.tokens = [norm.split() for norm in self.normalized]
+        self.trigram_count = []
+        postings = defaultdict(list)
+        exact_tokens = defaultdict(list)
+        compacts, tokens = [], []
+        for idx, compact in enumerate(self.compact):
+            grams = trigrams(compact)
+            self.trigram_count.append(len(grams))
+            for gram in grams:
+                postings[gram].append(idx)
+            compacts.append((compact, idx))
+            for token in self.tokens[idx]:
+                tokens.append((token, idx))
+            for token in set(self.tokens[idx]):
+                exact_tokens[token].append(idx)
+        self.postings = dict(postings)
+        self.exact_tokens = dict(exact_tokens)  # token -> names that have it
+        compacts.sort()
+        tokens.sort()
+        self.compact_keys = [key for key, _ in compacts]
+        self.compact_ids = [idx for _, idx in compacts]
+        self.token_keys = [key for key, _ in tokens]
+        self.token_ids = [idx for _, idx in tokens]
+
+    def __len__(self):
+        return len(self.names)
+
+    @staticmethod
+    def _range(keys, ids, prefix):
+        lo = bisect.bisect_left(keys, prefix)
+        hi = bisect.bisect_left(keys, prefix + '\uffff')
+        return set(ids[lo:hi])
+
+    def compact_prefix(self, prefix):
+        # Names whose space-free form starts with prefix
+        return self._range(self.compact_keys, self.compact_ids, prefix)
+
+    def token_prefix(self, prefix):
+        # Names with a token starting with prefix
+        return self._range(self.token_keys, self.token_ids, prefix)
+
+    def prefix_matches(self, prefix):
+        return self.compact_prefix(prefix) | self.token_prefix(prefix)
+
+    def search(self, query, limit=20):
+        # Returns [(index into names, score)] best first. A name scores its
+        # trigram similarity to the query plus bonuses: 3.0 for the exact name,
+        # 1.5 for a name starting with the query, 0.75 for one containing it,
+        # and 0.5 (+0.1 per exact token) when every query token starts some
+        # name token, in any order ("p rajendran", "rajendran p"). The prefix
+        # and token tests are set lookups worked out once per query, so the
+        # per-candidate loop is a few dict and set probes.
+        query_norm = normalize(query)
+        query_compact = query_norm.replace(' ', '')
+        if not query_compact:
+            return []
+        query_tokens = query_norm.split()
+        query_grams = trigrams(query_compact)
+        shared = Counter()
+        if len(query_compact) >= 3:
+            shared.update(chain.from_iterable(self.postings.get(gram, ()) for gram in query_grams))
+        starts = self.compact_prefix(query_compact)
+        token_sets = {token: self.token_prefix(token) for token in query_tokens}
+        candidates = starts | self.token_prefix(query_compact)
+        for token in query_tokens:
+            # Initials only narrow the ranking; on their own they would match half the catalog
+            if len(token) > 1 or len(query_tokens) == 1:
+                candidates |= self.compact_prefix(token) | token_sets[token]
+        if not candidates and not shared:
+            # Initials only, e.g. "r p"
+            candidates = set.intersection(*(self.prefix_matches(token) for token in query_tokens))
+        min_shared = MIN_SIMILARITY * len(query_grams)
+        candidates.update(idx for idx, count in shared.items() if count >= min_shared)
+        all_tokens = set.intersection(*token_sets.values())
+        exact = Counter(chain.from_iterable(self.exact_tokens.get(token, ()) for token in query_tokens))
+        compact, trigram_count, n_grams = self.compact, self.trigram_count, len(query_grams)
+        scored = []
+        for idx in candidates:
+            common = shared.get(idx)
+            score = common / (n_grams + trigram_count[idx] - common) if common else 0.0
+            if idx in starts:
+                score += 3.0 if compact[idx] == query_compact else 1.5
+            elif query_compact in compact[idx]:
+                score += 0.75
+            if idx in all_tokens:
+                score += 0.5 + 0.1 * exact.get(idx, 0)
+            if score >= MIN_SIMILARITY:
+                scored.append((-score, self.normalized[idx], idx))
+        if limit is None:
+            scored.sort()
+        else:
+            scored = heapq.nsmallest(limit, scored)
+        return [(idx, -neg_score) for neg_score, _, idx in scored]
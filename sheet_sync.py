@@ -0,0 +1,101 @@
+import hashlib
+import threading
+import time
+
+from gspread.utils import numericise_all, rowcol_to_a1
+
+
+def row_checksum(row):
+    return hashlib.sha1("\x1f".join(str(v) for v in row).encode("utf-8")).hexdigest()
+
+
+# Keeps a local copy of the review sheet and pulls only newly appended rows.
+# The sheet is append-only in normal use, so each refresh re-reads the last row
+# we ingested plus everything after it. If that anchor row no longer matches
+# (an edit or deletion shifted the data) or the sheet shrank, fall back to a
+# full reload. full_every forces a periodic full reload to catch edits further up.
+class ReviewSync:
+    def __init__(self, sheet, min_interval=65, full_every=20):
+        self.sheet = sheet
+        self.min_interval = min_interval
+        self.full_every = full_every
+        self.header = []
+        self.rows = []
+        self.records = []
+        self.version = 0
+        self.last_checksum = None
+        self.last_sync = None
+        self.syncs_since_full = 0
+        self.full_reloads = 0
+        self._lock = threading.Lock()
+
+    @property
+    def last_row(self):
+        # Sheet row number of the last ingested data row (row 1 is the header)
+        return len(self.rows) + 1
+
+    def refresh(self, force=False):
+        if self.sheet is None:
+            return self.records
+        with self._lock:
+            now = time.monotonic()
+            if not force and self.last_sync is not None and now - self.last_sync < self.min_interval:
+                return self.records
+            if not self.header or self.syncs_since_full >= self.full_every:
+                self._full_reload()
+            elif not self._incremental():
+                self._full_reload()
+            self.last_sync = time.monotonic()
+        return self.records
+
+    def _to_records(self, rows):
+        width = len(self.header)
+        return [
+            dict(zip(self.header, numericise_all(list(row) + [""] * (width - len(row)))))
+            for row in rows
+        ]
+
+    def _full_reload(self):
+        values = self.sheet.get_all_values()
+        self.header = list(values[0]) if values else []
+        self.rows = [list(row) for row in values[1:]]
+        self.records = self._to_records(self.rows)
+        self.last_checksum = row_checksum(self.rows[-1]) if self.rows else None
+        self.syncs_since_full = 0
+        self.full_reloads += 1
+        self.version += 1
+
+    def _incremental(self):
+        # Returns False when the local copy can no longer be trusted
+        self.syncs_since_full += 1
+        end_col = rowcol_to_a1(1, max(len(self.header), 1)).rstrip("0123456789")
+        if self.rows:
+            start = self.last_row
+        else:
+            start = 1  # re-read the header as the anchor
+        fetched = self.sheet.get_values(f"A{start}:{end_col}")
+        if not fetched:
+            return False
+        anchor, new_rows = fetched[0], fetched[1:]
+        if self.rows:
+            if row_checksum(_trim(anchor)) != row_checksum(_trim(self.rows[-1])):
+                return False
+        elif list(_trim(anchor)) != list(_trim(self.header)):
+            return False
+        new_rows = [list(row) for row in new_rows if any(str(v).strip() for v in row)]
+        if not new_rows:
+            return True
+        new_records = self._to_records(new_rows)
+        self.rows = self.rows + new_rows
+        self.records = self.records + new_records
+        self.last_checksum = row_checksum(self.rows[-1])
+        self.version += 1
+        return True
+
+
+def _trim(row):
+    # get_values pads/strips trailing blanks differently from get_all_values
+    row = list(row)
+    while row and row[-1] == "":
+        row.pop()
+    return row
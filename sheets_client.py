@@ -0,0 +1,117 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from gspread.utils import a1_range_to_grid_range
+
+import metrics
+from sheet_sync import _trim
+
+DEFAULT_DEADLINE = 10.0
+
+
+def worksheet_range(name, cells=""):
+    # A1 range for cells of worksheet name; the whole worksheet when cells is empty
+    quoted = "'" + name.replace("'", "''") + "'"
+    return f"{quoted}!{cells}" if cells else quoted
+
+
+def split_range(range_name):
+    # (worksheet name, cells) for an A1 range as built by worksheet_range
+    name, bang, cells = range_name.rpartition("!")
+    if not bang:
+        name, cells = range_name, ""
+    if name.startswith("'") and name.endswith("'"):
+        name = name[1:-1].replace("''", "'")
+    return name, cells
+
+
+# Local stand-in for the Sheets API: worksheets maps a worksheet name to its
+# rows. Reads come back trimmed the way the API trims them, and every call
+# sleeps for latency seconds to stand in for the round trip.
+class FakeBackend:
+    def __init__(self, worksheets, latency=0.0):
+        self.worksheets = {name: [[str(value) for value in row] for row in rows] for name, rows in worksheets.items()}
+        self.latency = latency
+        self.calls = []
+
+    def batch_get(self, spreadsheet_id, ranges, timeout=None):
+        self.calls.append(list(ranges))
+        if self.latency:
+            time.sleep(self.latency)
+        return [self._read(range_name) for range_name in ranges]
+
+    def _read(self, range_name):
+        name, cells = split_range(range_name)
+        if name not in self.worksheets:
+            raise ValueError(f"Unable to parse range: {range_name}")
+        grid = a1_range_to_grid_range(cells) if cells else {}
+        rows = self.worksheets[name][grid.get("startRowIndex", 0):grid.get("endRowIndex")]
+        rows = [_trim(row[grid.get("startColumnIndex", 0):grid.get("endColumnIndex")]) for row in rows]
+        while rows and not rows[-1]:
+            rows.pop()
+        return rows
+
+    def close(self):
+        pass
+
+
+# Asyncio front end for reading several worksheets of one spreadsheet. The
+# backend is anything with batch_get(spreadsheet_id, ranges, timeout) and
+# close(), such as FakeBackend. Each batch_get is a single values:batchGet
+# request for any number of ranges, run on the client's own thread pool under
+# its own deadline. gather() sends several batches at once, so load time
+# follows the slowest batch rather than the sum of them.
+class SheetsClient:
+    def __init__(self, spreadsheet_id, backend, max_concurrency=8, deadline=DEFAULT_DEADLINE):
+        self.spreadsheet_id = spreadsheet_id
+        self.backend = backend
+        self.deadline = deadline
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="sheets")
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self.backend.close()
+
+    async def batch_get(self, ranges, deadline=None):
+        # {range: rows}; raises TimeoutError when the deadline passes first.
+        # A timed-out request is abandoned, not interrupted: its thread is
+        # freed when the HTTP timeout (also the deadline) fires.
+        ranges = list(ranges)
+        deadline = self.deadline if deadline is None else deadline
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        try:
+            values = await asyncio.wait_for(
+                loop.run_in_executor(self._executor, self.backend.batch_get, self.spreadsheet_id, ranges, deadline),
+                deadline,
+            )
+        except asyncio.TimeoutError:
+            metrics.sheets_call_errors.inc(method="batchGet")
+            raise TimeoutError(f"Sheets batchGet of {len(ranges)} ranges took longer than {deadline}s") from None
+        except Exception:
+            metrics.sheets_call_errors.inc(method="batchGet")
+            raise
+        finally:
+            metrics.sheets_call_seconds.observe(time.perf_counter() - started, method="batchGet")
+        return dict(zip(ranges, values))
+
+    async def gather(self, batches, deadline=None):
+        # batches maps a name to a list of ranges. Every batch is fetched
+        # concurrently; a failed or timed-out batch maps to its exception so
+        # the others still come back.
+        results = await asyncio.gather(
+            *(self.batch_get(ranges, deadline) for ranges in batches.values()), return_exceptions=True
+        )
+        return dict(zip(batches, results))
+
+    async def worksheets(self, names, deadline=None):
+        # Whole worksheets by name, in one request
+        ranges = [worksheet_range(name) for name in names]
+        values = await self.batch_get(ranges, deadline)
+        return {name: values[range_name] for name, range_name in zip(names, ranges)}
+
+    def read_worksheets(self, names, deadline=None):
+        # Blocking version of worksheets() for the Streamlit script thread,
+        # which has no event loop of its own
+        return asyncio.run(self.worksheets(names, deadline))
@@ -0,0 +1,98 @@
+import heapq
+from itertools import count
+
+from timetable import clash_engine, parse_slots, SlotState
+
+NEUTRAL_SCORE = 5.0  # used for faculty with no reviews yet
+
+
+def parse_options(text):
+    # One option per line: "COURSE | Faculty | Slots | Room" (room optional).
+    # Returns [{"course_code", "options": [...]}] in first-seen course order.
+    courses = {}
+    for line in text.splitlines():
+        parts = [part.strip() for part in line.split("|")]
+        if len(parts) < 3 or not parts[0] or not parts[2]:
+            continue
+        course_code, faculty, slot_str = parts[0].upper(), parts[1], parts[2]
+        room = parts[3] if len(parts) > 3 else ""
+        courses.setdefault(course_code, []).append(
+            {"course_code": course_code, "faculty": faculty, "slots": slot_str, "room": room}
+        )
+    return [{"course_code": code, "options": options} for code, options in courses.items()]
+
+
+def _prepare(courses, score, engine, base):
+    # Drops options that are invalid, clash with themselves or with base, and
+    # precomputes each option's masks and score. Courses with the fewest
+    # options go first so conflicts prune the search as early as possible.
+    prepared = []
+    for index, course in enumerate(courses):
+        options = []
+        for option in course["options"]:
+            slots = parse_slots(option["slots"])
+            if not slots or engine.check(slots, base):
+                continue
+            time_mask, cell_mask = engine.slots_mask(slots)
+            options.append((score(option), time_mask, cell_mask, option))
+        options.sort(key=lambda item: -item[0])
+        prepared.append((index, options))
+    prepared.sort(key=lambda item: len(item[1]))
+    return prepared
+
+
+def solve(courses, score=None, top_n=None, engine=clash_engine, base=None):
+    # Yields (total_score, [chosen option per course, in input order]) for every
+    # clash-free timetable, best-scored options explored first. With top_n, branches
+    # that cannot beat the current n-th best total are pruned (branch and bound).
+    score = score or (lambda option: NEUTRAL_SCORE)
+    base = base or SlotState()
+    prepared = _prepare(courses, score, engine, base)
+    if not prepared or any(not options for _, options in prepared):
+        return
+    # best_rest[i] = highest possible score from courses i.. onwards
+    best_rest = [0.0] * (len(prepared) + 1)
+    for i in range(len(prepared) - 1, -1, -1):
+        best_rest[i] = best_rest[i + 1] + prepared[i][1][0][0]
+    best = []  # min-heap of the top_n totals seen so far
+    chosen = [None] * len(prepared)
+
+    def search(depth, time_mask, cell_mask, total):
+        if top_n and len(best) >= top_n and total + best_rest[depth] <= best[0]:
+            return
+        if depth == len(prepared):
+            if top_n:
+                if len(best) < top_n:
+                    heapq.heappush(best, total)
+                else:
+                    heapq.heapreplace(best, total)
+            picks = [None] * len(courses)
+            for (index, _), option in zip(prepared, chosen):
+                picks[index] = option
+            yield total, picks
+            return
+        for option_score, option_time, option_cells, option in prepared[depth][1]:
+            if option_time & time_mask or option_cells & cell_mask:
+                continue
+            chosen[depth] = option
+            yield from search(depth + 1, time_mask | option_time, cell_mask | option_cells, total + option_score)
+
+    yield from search(0, base.time_mask, base.cell_mask, 0.0)
+
+
+def top_timetables(courses, n=10, score=None, engine=clash_engine, base=None, progress=None):
+    # Best n timetables, highest total score first. progress(found, best_total)
+    # is called after every timetable the search yields.
+    tie = count()
+    heap = []
+    found = 0
+    for total, picks in solve(courses, score, n, engine, base):
+        found += 1
+        item = (total, -next(tie), picks)
+        if len(heap) < n:
+            heapq.heappush(heap, item)
+        elif item > heap[0]:
+            heapq.heapreplace(heap, item)
+        if progress is not None:
+            progress(found, max(heap)[0])
+    return [(total, picks) for total, _, picks in sorted(heap, reverse=True)]
@@ -0,0 +1,146 @@
+import hashlib
+import secrets
+import threading
+import time
+
+import db
+from reviews import clean_name
+
+ACCEPTED = "accepted"
+DUPLICATE = "duplicate"
+RATE_LIMITED = "rate_limited"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS guard_meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS guard_pairs (digest INTEGER PRIMARY KEY, created_at REAL NOT NULL);
+CREATE TABLE IF NOT EXISTS guard_buckets (client TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL);
+"""
+
+
+def client_address(headers, ip_address=None, trusted_proxies=0):
+    # The address the request came from. X-Forwarded-For is only believed for
+    # the hops our own trusted_proxies appended (the rightmost ones); anything
+    # to the left of those was sent by the client and can say anything.
+    headers = {key.lower(): value for key, value in (headers or {}).items()}
+    hops = [hop.strip() for hop in headers.get("x-forwarded-for", "").split(",") if hop.strip()]
+    if trusted_proxies and len(hops) >= trusted_proxies:
+        return hops[-trusted_proxies]
+    if not isinstance(ip_address, str):
+        return ""  # unknown, e.g. no client connection behind this session
+    return ip_address
+
+
+def client_fingerprint(headers, ip_address=None, salt="", trusted_proxies=0, browser_id=""):
+    # Stable, anonymous rate-limit key for whoever is sending requests: their
+    # address plus browser headers, hashed with a per-install salt so raw
+    # addresses are never stored. Users behind one NAT with the same browser
+    # share it, so it is only used for the token bucket. When the address is
+    # unknown (localhost, or a local proxy that hides it) the browser id
+    # stands in for it, or every visitor would share one bucket.
+    headers = {key.lower(): value for key, value in (headers or {}).items()}
+    address = client_address(headers, ip_address, trusted_proxies) or f"browser:{browser_id}"
+    parts = [salt, address, headers.get("user-agent", ""), headers.get("accept-language", "")]
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()[:32]
+
+
+def browser_key(browser_id, salt=""):
+    # Salted hash of a per-browser id (a cookie or session id), used for the
+    # once-per-teacher check so people sharing an address are told apart
+    return hashlib.sha256(f"{salt}\x1f{browser_id}".encode("utf-8")).hexdigest()[:32]
+
+
+def pair_digest(browser, teacher):
+    # 64-bit signed hash of (browser, teacher) so it fits an SQLite INTEGER key
+    data = f"{browser}\x1f{clean_name(teacher)}".encode("utf-8")
+    return int.from_bytes(hashlib.sha256(data).digest()[:8], "big", signed=True)
+
+
+# Process-wide guard in front of the review submit path. Every client address
+# gets a token bucket (capacity submissions, refilled at refill_per_second),
+# and each (browser, teacher) pair is admitted once. Seen pairs are kept as 64-bit hashes
+# in memory for O(1) checks and written through to SQLite, as are the buckets,
+# so neither resets when the app restarts.
+class SubmissionGuard:
+    def __init__(self, path="guard.db", capacity=5, refill_per_second=1 / 120, max_clients=10000, trusted_proxies=0):
+        self.path = path
+        self.trusted_proxies = trusted_proxies
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.max_clients = max_clients
+        self.conn = db.connect(path, SCHEMA)
+        self._lock = threading.Lock()
+        self.salt = self._load_salt()
+        self._pairs = {row[0] for row in self.conn.execute("SELECT digest FROM guard_pairs")}
+        self._buckets = {}  # client -> (tokens, updated_at)
+        self.rejected = {DUPLICATE: 0, RATE_LIMITED: 0}
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+    def _load_salt(self):
+        with self.conn:
+            self.conn.execute("INSERT OR IGNORE INTO guard_meta (key, value) VALUES ('salt', ?)", (secrets.token_hex(16),))
+        return self.conn.execute("SELECT value FROM guard_meta WHERE key = 'salt'").fetchone()[0]
+
+    def fingerprint(self, headers, ip_address=None, browser_id=""):
+        return client_fingerprint(headers, ip_address, self.salt, self.trusted_proxies, browser_id)
+
+    def browser(self, browser_id):
+        return browser_key(browser_id, self.salt)
+
+    def _bucket(self, client, now):
+        tokens, updated_at = self._buckets.get(client) or self._stored_bucket(client, now)
+        return min(self.capacity, tokens + (now - updated_at) * self.refill_per_second)
+
+    def _stored_bucket(self, client, now):
+        row = self.conn.execute("SELECT tokens, updated_at FROM guard_buckets WHERE client = ?", (client,)).fetchone()
+        return row or (self.capacity, now)
+
+    def _forget_full_buckets(self, now):
+        # A bucket that has refilled completely is the same as no bucket
+        for client in [client for client in self._buckets if self._bucket(client, now) >= self.capacity]:
+            del self._buckets[client]
+
+    def seen(self, browser, teacher):
+        return pair_digest(browser, teacher) in self._pairs
+
+    def admit(self, client, browser, teacher):
+        # ACCEPTED (and recorded), DUPLICATE or RATE_LIMITED; client is the
+        # fingerprint() rate-limit key, browser the browser() key
+        digest = pair_digest(browser, teacher)
+        now = time.time()
+        with self._lock:
+            if digest in self._pairs:
+                self.rejected[DUPLICATE] += 1
+                return DUPLICATE
+            tokens = self._bucket(client, now)
+            if tokens < 1:
+                self.rejected[RATE_LIMITED] += 1
+                return RATE_LIMITED
+            tokens -= 1
+            self._pairs.add(digest)
+            self._buckets[client] = (tokens, now)
+            if len(self._buckets) > self.max_clients:
+                self._forget_full_buckets(now)
+            with self.conn:
+                self.conn.execute("INSERT OR IGNORE INTO guard_pairs (digest, created_at) VALUES (?, ?)", (digest, now))
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO guard_buckets (client, tokens, updated_at) VALUES (?, ?, ?)",
+                    (client, tokens, now),
+                )
+        return ACCEPTED
+
+    def release(self, browser, teacher):
+        # Undo the pair record of an admitted submission that then failed to save
+        digest = pair_digest(browser, teacher)
+        with self._lock:
+            self._pairs.discard(digest)
+            with self.conn:
+                self.conn.execute("DELETE FROM guard_pairs WHERE digest = ?", (digest,))
+
+    def retry_after(self, client):
+        # Seconds until client may submit again
+        with self._lock:
+            tokens = self._bucket(client, time.time())
+        return 0.0 if tokens >= 1 else (1 - tokens) / self.refill_per_second
@@ -0,0 +1,174 @@
+import logging
+import random
+import threading
+import time
+from collections import OrderedDict, deque
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+SENT = "sent"
+RETRYING = "retrying"
+FAILED = "failed"
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+def is_retryable(exc):
+    # gspread.exceptions.APIError carries the HTTP response; quota errors are 429
+    status = getattr(getattr(exc, "response", None), "status_code", None)
+    if status is not None:
+        return status in RETRYABLE_STATUS
+    text = str(exc).lower()
+    return "quota" in text or "rate limit" in text or isinstance(exc, (ConnectionError, TimeoutError))
+
+
+# Process-wide queue that coalesces submissions into batches. A worker thread
+# calls flush(items) once max_batch items are waiting or the oldest has waited
+# max_wait seconds, retrying quota/transient errors with exponential backoff.
+# Each item is (key, payload); status(key) reports how that item is doing.
+class SubmissionQueue:
+    def __init__(self, flush, max_batch=50, max_wait=2.0, max_retries=5, base_delay=1.0, max_delay=60.0, keep_status=10000):
+        self.flush = flush
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.keep_status = keep_status
+        self._items = deque()
+        self._status = OrderedDict()
+        self._cond = threading.Condition()
+        self._stop = False
+        self._thread = None
+        self.batches = 0
+        self.flushed = 0
+        self.failed = 0
+        self.retries = 0
+        self.last_batch_size = 0
+        self.last_flush_seconds = 0.0
+        self.total_flush_seconds = 0.0
+
+    def submit(self, key, payload):
+        with self._cond:
+            if self._status.get(key) in (QUEUED, RETRYING):
+                return key
+            self._items.append((key, payload, time.monotonic()))
+            self._set_status(key, QUEUED)
+            self._cond.notify()
+        return key
+
+    def status(self, key):
+        with self._cond:
+            return self._status.get(key)
+
+    def __contains__(self, key):
+        return self.status(key) in (QUEUED, RETRYING)
+
+    def depth(self):
+        with self._cond:
+            return len(self._items)
+
+    def metrics(self):
+        with self._cond:
+            return {
+                "queue_depth": len(self._items),
+                "batches": self.batches,
+                "flushed": self.flushed,
+                "failed": self.failed,
+                "retries": self.retries,
+                "last_batch_size": self.last_batch_size,
+                "avg_batch_size": self.flushed / self.batches if self.batches else 0.0,
+                "last_flush_seconds": self.last_flush_seconds,
+                "avg_flush_seconds": self.total_flush_seconds / self.batches if self.batches else 0.0,
+            }
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="submission-queue", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, drain=True):
+        with self._cond:
+            self._stop = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if drain:
+            self.drain()
+
+    def drain(self):
+        # Flush everything synchronously on the calling thread
+        while True:
+            batch = self._take(force=True)
+            if not batch:
+                return
+            self._flush_batch(batch)
+
+    def _set_status(self, key, status):
+        self._status[key] = status
+        self._status.move_to_end(key)
+        while len(self._status) > self.keep_status:
+            self._status.popitem(last=False)
+
+    def _take(self, force=False):
+        with self._cond:
+            if not self._items:
+                return []
+            oldest = self._items[0][2]
+            if not force and len(self._items) < self.max_batch and time.monotonic() - oldest < self.max_wait:
+                return []
+            count = min(self.max_batch, len(self._items))
+            return [self._items.popleft()[:2] for _ in range(count)]
+
+    def _flush_batch(self, batch):
+        attempt = 0
+        while True:
+            started = time.monotonic()
+            try:
+                self.flush([payload for _, payload in batch])
+            except Exception as exc:
+                if attempt < self.max_retries and is_retryable(exc):
+                    delay = min(self.max_delay, self.base_delay * 2 ** attempt) * (0.5 + random.random() / 2)
+                    attempt += 1
+                    with self._cond:
+                        self.retries += 1
+                        for key, _ in batch:
+                            self._set_status(key, RETRYING)
+                    logger.warning("Submission flush failed (%s), retrying in %.1fs", exc, delay)
+                    time.sleep(delay)
+                    continue
+                logger.exception("Submission flush failed, giving up on %d items", len(batch))
+                with self._cond:
+                    self.failed += len(batch)
+                    for key, _ in batch:
+                        self._set_status(key, FAILED)
+                return False
+            elapsed = time.monotonic() - started
+            with self._cond:
+                self.batches += 1
+                self.flushed += len(batch)
+                self.last_batch_size = len(batch)
+                self.last_flush_seconds = elapsed
+                self.total_flush_seconds += elapsed
+                for key, _ in batch:
+                    self._set_status(key, SENT)
+            return True
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if self._stop:
+                    return
+                if not self._items:
+                    self._cond.wait()
+                    continue
+                wait = self.max_wait - (time.monotonic() - self._items[0][2])
+                if len(self._items) < self.max_batch and wait > 0:
+                    self._cond.wait(wait)
+                    continue
+            batch = self._take(force=True)
+            if batch:
+                self._flush_batch(batch)
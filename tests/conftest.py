@@ -0,0 +1,33 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from reviews import SHEET_COLUMNS
+
+
+# In-memory stand-in for a gspread worksheet: the calls ReviewSync and the
+# Replicator make, with values coming back as strings like the real API
+class FakeSheet:
+    def __init__(self, rows=()):
+        self.header = list(SHEET_COLUMNS)
+        self.rows = [list(row) for row in rows]
+
+    def get_all_values(self):
+        return [list(self.header)] + [[str(v) for v in row] for row in self.rows]
+
+    def get_values(self, range_name):
+        start = int(range_name[1:].split(":")[0])
+        return self.get_all_values()[start - 1:]
+
+    def append_rows(self, rows):
+        first_row = len(self.rows) + 2
+        self.rows.extend(list(row) for row in rows)
+        return {"updates": {"updatedRange": f"'Sheet1'!A{first_row}:G{first_row + len(rows) - 1}"}}
+
+
+@pytest.fixture
+def fake_sheet():
+    return FakeSheet([["Dr. Indhira K", 8, 7, 6, 5, 6.5, "good"], ["Dr. Karthikeyan K", 4, 4, 4, 4, 4, ""]])
@@ -0,0 +1,114 @@
+import io
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from PIL import Image
+
+from images import ThumbnailCache
+
+
+def png(width, height, color):
+    out = io.BytesIO()
+    Image.new("RGB", (width, height), color).save(out, format="PNG")
+    return out.getvalue()
+
+
+# Local stand-in for the image host: /<name> serves IMAGES[name], anything else is a 404
+IMAGES = {"red": png(600, 400, "red"), "red-again": png(600, 400, "red"), "blue": png(100, 80, "blue")}
+for i in range(20):
+    out = io.BytesIO()
+    Image.effect_noise((400, 400), 50 + i).save(out, format="PNG")
+    IMAGES[f"noise{i}"] = out.getvalue()
+
+
+class ImageHandler(BaseHTTPRequestHandler):
+    requests = []
+
+    def do_GET(self):
+        ImageHandler.requests.append(self.path)
+        body = IMAGES.get(self.path.lstrip("/"))
+        if body is None:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def host():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ImageHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+def test_thumbnails_are_resized_and_fetched_once(tmp_path, host):
+    ImageHandler.requests.clear()
+    cache = ThumbnailCache(str(tmp_path))
+    data = cache.get(f"{host}/red")
+    with Image.open(io.BytesIO(data)) as image:
+        assert (image.format, image.size) == ("WEBP", (150, 100))
+    assert cache.get(f"{host}/red") == data
+    assert ImageHandler.requests == ["/red"]
+    # Small images keep their size
+    with Image.open(io.BytesIO(cache.get(f"{host}/blue"))) as image:
+        assert image.size == (100, 80)
+
+
+def test_identical_images_share_one_blob(tmp_path, host):
+    cache = ThumbnailCache(str(tmp_path))
+    assert cache.get(f"{host}/red") == cache.get(f"{host}/red-again")
+    assert len(os.listdir(cache.blob_dir)) == 1
+    assert len(os.listdir(cache.ref_dir)) == 2
+
+
+def test_cached_counts_lookups_without_fetching(tmp_path, host):
+    ImageHandler.requests.clear()
+    cache = ThumbnailCache(str(tmp_path))
+    assert cache.cached(f"{host}/red") is None
+    assert ImageHandler.requests == []
+    cache.get(f"{host}/red")
+    assert cache.cached(f"{host}/red") is not None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_warm_fetches_in_the_background(tmp_path, host):
+    cache = ThumbnailCache(str(tmp_path))
+    cache.warm(f"{host}/blue")
+    deadline = time.monotonic() + 5
+    while cache.cached(f"{host}/blue") is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert cache.cached(f"{host}/blue") is not None
+
+
+def test_failed_fetches_are_not_retried_right_away(tmp_path, host):
+    ImageHandler.requests.clear()
+    cache = ThumbnailCache(str(tmp_path), retry_after=600)
+    assert cache.get(f"{host}/missing") is None
+    assert cache.get(f"{host}/missing") is None
+    assert ImageHandler.requests == ["/missing"]
+
+
+def test_least_recently_used_blobs_are_evicted(tmp_path, host):
+    urls = [f"{host}/noise{i}" for i in range(20)]
+    sizes = [len(ThumbnailCache(str(tmp_path / "sizes")).get(url)) for url in urls]
+    cache = ThumbnailCache(str(tmp_path / "small"), max_bytes=sum(sizes) // 2)
+    for url in urls:
+        cache.get(url)
+    assert cache.total_bytes <= cache.max_bytes
+    assert cache.cached(urls[-1]) is not None
+    assert cache.cached(urls[0]) is None
+
+
+def test_prewarm(tmp_path, host):
+    cache = ThumbnailCache(str(tmp_path))
+    urls = [f"{host}/red", f"{host}/blue", f"{host}/red", f"{host}/missing"]
+    assert cache.prewarm(urls) == 2
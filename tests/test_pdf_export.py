@@ -0,0 +1,37 @@
+import io
+import re
+import zipfile
+
+import pytest
+
+from pdf_export import TimetablePDF, export_zip, sample_item
+
+
+@pytest.fixture(scope="module")
+def renderer():
+    return TimetablePDF()
+
+
+def test_render_is_a_pdf(renderer):
+    item = sample_item()
+    data = renderer.render(item["timetable"], item["cell_is_lab"], item["faculty_list"])
+    assert data.startswith(b"%PDF")
+
+
+def test_render_many_has_a_page_per_item(renderer):
+    # Up to six courses fit on one page with their faculty list
+    data = renderer.render_many([sample_item(6), sample_item(3), sample_item(1)])
+    assert re.findall(rb"/Count (\d+)", data) == [b"3"]
+
+
+def test_export_zip_has_one_pdf_per_option(renderer):
+    items = [sample_item(), sample_item(3, title="Option 2")]
+    with zipfile.ZipFile(io.BytesIO(export_zip(items, renderer))) as archive:
+        assert archive.namelist() == ["timetable_1.pdf", "timetable_2.pdf"]
+        for name in archive.namelist():
+            assert archive.read(name).startswith(b"%PDF")
+
+
+def test_export_zip_of_nothing_is_an_empty_archive(renderer):
+    with zipfile.ZipFile(io.BytesIO(export_zip([], renderer))) as archive:
+        assert archive.namelist() == []
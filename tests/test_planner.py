@@ -0,0 +1,74 @@
+import base64
+import json
+import zlib
+
+import pytest
+
+from planner import Plan, PlanStore, TOKEN_VERSION, diff_plans, plan_id, slots_to_mask
+
+
+def make_plan(*entries):
+    plan = Plan()
+    for code, slots, faculty in entries:
+        plan.add({"course_code": code, "course_name": f"{code} name", "faculty": faculty, "slots": slots, "room": "SJT101"})
+    return plan
+
+
+def token_for(rows):
+    data = json.dumps([TOKEN_VERSION, rows], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(zlib.compress(data)).decode("ascii").rstrip("=")
+
+
+def test_token_round_trip():
+    plan = make_plan(("CSE1001", "A1+TA1", "Dr. Çelik Ñúñez"), ("CSE1002", "L31+L32", "Dr. Indhira K"), ("MAT2001", "B1", ""))
+    decoded = Plan.decode(plan.encode())
+    assert decoded.rows == plan.rows
+    assert decoded.faculty_list == plan.faculty_list
+    assert decoded.timetable == plan.timetable
+    assert decoded.cell_is_lab == plan.cell_is_lab
+    assert diff_plans(plan, decoded) == ([], [])
+
+
+def test_empty_plan_round_trips():
+    assert len(Plan.decode(Plan().encode())) == 0
+
+
+@pytest.mark.parametrize("token", ["", "garbage", "!!!", token_for("not rows")])
+def test_decode_rejects_junk(token):
+    with pytest.raises(ValueError):
+        Plan.decode(token)
+
+
+def test_decode_rejects_other_versions():
+    data = json.dumps([TOKEN_VERSION + 1, []]).encode("utf-8")
+    with pytest.raises(ValueError, match="version"):
+        Plan.decode(base64.urlsafe_b64encode(zlib.compress(data)).decode("ascii"))
+
+
+def test_decode_rejects_clashing_courses():
+    mask = format(slots_to_mask(["A1"]), "x")
+    with pytest.raises(ValueError, match="clashes with another course"):
+        Plan.decode(token_for([["CSE1001", "", "", "", mask], ["CSE1002", "", "", "", mask]]))
+
+
+def test_decode_rejects_a_course_that_clashes_with_itself():
+    with pytest.raises(ValueError, match="clash with each other"):
+        Plan.decode(token_for([["CSE1001", "", "", "", format(slots_to_mask(["A1", "L1"]), "x")]]))
+
+
+def test_diff_plans():
+    old = make_plan(("CSE1001", "A1", "X"), ("CSE1002", "B1", "Y"))
+    new = make_plan(("CSE1001", "A1", "X"), ("CSE1003", "C1", "Z"))
+    added, removed = diff_plans(old, new)
+    assert [entry["course_code"] for entry in added] == ["CSE1003"]
+    assert [entry["course_code"] for entry in removed] == ["CSE1002"]
+
+
+def test_plan_store_ids_are_content_addressed(tmp_path):
+    store = PlanStore(str(tmp_path / "plans.db"))
+    plan = make_plan(("CSE1001", "A1+TA1", "X"))
+    saved_id = store.save(plan)
+    assert saved_id == store.save(plan) == plan_id(plan.encode())
+    assert store.load(saved_id.upper()).rows == plan.rows
+    assert store.load("missing") is None
+    store.close()
@@ -0,0 +1,104 @@
+import io
+import json
+
+import pytest
+
+from review_backup import StoreTarget, export_reviews, import_reviews, read_backup, source_signature
+from review_store import ReviewStore
+
+HEADER = "teacher,teaching,leniency,correction,da_quiz,overall,comment\n"
+
+
+def run_import(text, store, fmt="csv", **kwargs):
+    return import_reviews(read_backup(io.StringIO(text), fmt), StoreTarget(store), **kwargs)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ReviewStore(str(tmp_path / "reviews.db"))
+
+
+def test_import_then_reimport_is_all_duplicates(store):
+    text = HEADER + "Dr. Indhira K,8,7,6,5,6.5,good\nDr. Karthikeyan K,4,4,4,4,,\n"
+    stats = run_import(text, store)
+    assert (stats["records"], stats["imported"], stats["duplicates"], stats["rejected"]) == (2, 2, 0, [])
+    assert store.records()[1]["Overall Rating"] == 4  # recomputed from the criteria
+    stats = run_import(text, store)
+    assert (stats["imported"], stats["duplicates"]) == (0, 2)
+    assert store.count() == 2
+
+
+def test_identical_rows_in_one_file_are_all_kept(store):
+    store.add(["Dr. Indhira K", 5, 5, 5, 5, 5, ""])
+    stats = run_import(HEADER + "Dr. Indhira K,5,5,5,5,5,\n" * 3, store)
+    # One copy was already in the store; the other two are new reviews
+    assert (stats["imported"], stats["duplicates"]) == (2, 1)
+    assert store.count() == 3
+
+
+def test_duplicates_ignore_number_formatting(store):
+    store.add(["Dr. Indhira K", 5, 5, 5, 5, 5.0, "ok"])
+    stats = run_import(HEADER + "  Dr. Indhira K,5.0,5,5,5,5,ok \n", store)
+    assert (stats["imported"], stats["duplicates"]) == (0, 1)
+
+
+def test_rejects_report_their_position(store):
+    text = HEADER + "\n".join([
+        ",5,5,5,5,5,",
+        "Dr. Indhira K,11,5,5,5,5,",
+        "Dr. Indhira K,x,5,5,5,5,",
+        "Dr. Indhira K,5,5,5,5,12,",
+        "Dr. Indhira K,5,5,5,5,5," + "a" * 101,
+        "Dr. Indhira K,5,5,5,5,5,fine",
+    ]) + "\n"
+    stats = run_import(text, store)
+    assert stats["imported"] == 1
+    assert [position for position, _ in stats["rejected"]] == [2, 3, 4, 5, 6]
+    assert stats["rejected"][0][1] == "Teacher is required."
+
+
+def test_jsonl_rejects_lines_that_are_not_objects(store):
+    text = json.dumps({"teacher": "Dr. Indhira K", "teaching": 5, "leniency": 5, "correction": 5, "da_quiz": 5}) + "\n[1]\n{bad\n"
+    stats = run_import(text, store, fmt="jsonl")
+    assert stats["imported"] == 1
+    assert stats["rejected"] == [(2, "Not a JSON object."), (3, "Not a JSON object.")]
+
+
+def test_catalog_spelling_is_applied(store):
+    run_import(HEADER + "dr indhira k,5,5,5,5,5,\n", store, canonical_names={"indhira k": "Dr. Indhira K"})
+    assert store.records()[0]["Teacher "] == "Dr. Indhira K"
+
+
+def test_interrupted_import_resumes_from_checkpoint(tmp_path, store):
+    path = tmp_path / "backup.csv"
+    path.write_text(HEADER + "".join(f"T{i % 3},5,5,5,5,5,\n" for i in range(10)))
+    checkpoint = str(tmp_path / "backup.csv.checkpoint")
+    signature = source_signature(str(path), "store")
+
+    class Interrupted(StoreTarget):
+        writes = 0
+
+        def write(self, rows):
+            Interrupted.writes += 1
+            if Interrupted.writes == 2:
+                raise KeyboardInterrupt
+            super().write(rows)
+
+    with pytest.raises(KeyboardInterrupt):
+        with open(path) as f:
+            import_reviews(read_backup(f), Interrupted(store), checkpoint, signature, batch_size=4)
+    assert store.count() == 4
+    with open(path) as f:
+        stats = import_reviews(read_backup(f), StoreTarget(store), checkpoint, signature, batch_size=4)
+    assert (stats["records"], stats["imported"], stats["duplicates"]) == (10, 10, 0)
+    assert store.count() == 10
+    assert not (tmp_path / "backup.csv.checkpoint").exists()
+
+
+def test_export_round_trips(store):
+    store.add(["Dr. Indhira K", 8, 7, 6, 5, 6.5, "good, really"])
+    for fmt in ("csv", "jsonl"):
+        out = io.StringIO()
+        assert export_reviews(store.iter_rows(), out, fmt) == 1
+        stats = run_import(out.getvalue(), store, fmt=fmt)
+        assert (stats["imported"], stats["duplicates"]) == (0, 1)
@@ -0,0 +1,63 @@
+from review_store import Replicator, ReviewStore
+from reviews import COMMENT_COL, TEACHER_COL
+from submit_queue import SENT
+
+
+def teachers(store):
+    return [record[TEACHER_COL] for record in store.records()]
+
+
+def make_replicator(tmp_path, sheet):
+    return Replicator(ReviewStore(str(tmp_path / "reviews.db")), sheet)
+
+
+def test_pull_copies_the_sheet(tmp_path, fake_sheet):
+    replicator = make_replicator(tmp_path, fake_sheet)
+    assert replicator.pull() == 2
+    assert teachers(replicator.store) == ["Dr. Indhira K", "Dr. Karthikeyan K"]
+    assert replicator.pull() == 0
+
+
+def test_submit_is_local_then_appended(tmp_path, fake_sheet):
+    replicator = make_replicator(tmp_path, fake_sheet)
+    replicator.pull()
+    review_id = replicator.submit(["Dr. Gargi Chakraborty", 9, 9, 9, 9, 9, "clear"])
+    assert replicator.store.count() == 3
+    assert len(fake_sheet.rows) == 2  # not sent until the queue flushes
+
+    replicator.queue.drain()
+    assert replicator.status(review_id) == SENT
+    assert fake_sheet.rows[-1] == ["Dr. Gargi Chakraborty", 9, 9, 9, 9, 9, "clear"]
+    assert replicator.store.pending() == []
+
+    # Pulling the appended row back maps onto the local copy instead of duplicating it
+    replicator.pull()
+    assert teachers(replicator.store) == ["Dr. Indhira K", "Dr. Karthikeyan K", "Dr. Gargi Chakraborty"]
+
+
+def test_push_requeues_reviews_left_pending(tmp_path, fake_sheet):
+    store = ReviewStore(str(tmp_path / "reviews.db"))
+    store.add(["Dr. Indhira K", 1, 2, 3, 4, 2.5, "written before a restart"])
+    replicator = Replicator(store, fake_sheet)
+    replicator.run_once()
+    replicator.queue.drain()
+    assert fake_sheet.rows[-1][-1] == "written before a restart"
+    assert store.pending() == []
+    assert store.count() == 3
+
+
+def test_remote_edit_is_pulled(tmp_path, fake_sheet):
+    replicator = make_replicator(tmp_path, fake_sheet)
+    replicator.pull()
+    fake_sheet.rows[-1][-1] = "edited on the sheet"
+    replicator.pull()
+    assert replicator.store.records()[-1][COMMENT_COL] == "edited on the sheet"
+    assert replicator.store.count() == 2
+
+
+def test_remote_delete_is_pulled(tmp_path, fake_sheet):
+    replicator = make_replicator(tmp_path, fake_sheet)
+    replicator.pull()
+    del fake_sheet.rows[0]
+    replicator.pull()
+    assert teachers(replicator.store) == ["Dr. Karthikeyan K"]
@@ -0,0 +1,47 @@
+import itertools
+
+from timetable import clash_engine, lab_times, parse_slots, parse_time, slot_to_cells, theory_times, SlotState
+
+
+def slot_minutes(slot):
+    # {(day, (start, end))} straight from the period times of each cell the slot fills
+    times = lab_times if slot.startswith("L") else theory_times
+    spans = set()
+    for day, period in slot_to_cells[slot]:
+        start, _, end = times[period].partition(" to ")
+        spans.add((day, (parse_time(start), parse_time(end))))
+    return spans
+
+
+def truly_clash(a, b):
+    if set(slot_to_cells[a]) & set(slot_to_cells[b]):
+        return True
+    return any(day_a == day_b and s1 < e2 and s2 < e1
+               for day_a, (s1, e1) in slot_minutes(a) for day_b, (s2, e2) in slot_minutes(b))
+
+
+def test_pairwise_clashes_match_slot_times():
+    for a, b in itertools.combinations(sorted(slot_to_cells), 2):
+        assert bool(clash_engine.check([a, b])) == truly_clash(a, b), (a, b)
+
+
+def test_check_against_state_matches_pairwise():
+    state = SlotState()
+    taken = ["A1", "TA1", "L31", "L32"]
+    clash_engine.add(state, taken, 0)
+    for slot in slot_to_cells:
+        expected = any(slot == other or truly_clash(slot, other) for other in taken)
+        assert bool(clash_engine.check([slot], state)) == expected, slot
+
+
+def test_remove_frees_the_slots():
+    state = SlotState()
+    clash_engine.add(state, ["A1", "TA1"], 0)
+    clash_engine.add(state, ["B1"], 1)
+    clash_engine.remove(state, 0)
+    assert clash_engine.check(["A1"], state) == []
+    assert clash_engine.check(["B1"], state)
+
+
+def test_unknown_slot_is_reported():
+    assert clash_engine.check(parse_slots("a1+XX9")) == [("XX9", None, [])]
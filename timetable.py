@@ -0,0 +1,240 @@
+import html
+import re
+from datetime import datetime
+from functools import lru_cache
+
+
+def parse_time(t):
+    # Handles both '8:00 AM' and '08:00 AM' and returns minutes since midnight
+    t = t.strip().replace('AM', ' AM').replace('PM', ' PM')
+    try:
+        return int(datetime.strptime(t, "%I:%M %p").hour) * 60 + int(datetime.strptime(t, "%I:%M %p").minute)
+    except Exception:
+        return None
+
+def time_range_to_tuple(start, end):
+    s = parse_time(start)
+    e = parse_time(end)
+    return (s, e)
+
+# --- FFCS TimetableData mapping (from ffcs-planner-main/lib/slots.ts) ---
+days = ["MON", "TUE", "WED", "THU", "FRI"]
+timetableData = {
+    "MON": [
+        ["A1", "L1"], ["F1", "L2"], ["D1", "L3"], ["TB1", "L4"], ["TG1", "L5"], ["L6"], [""],
+        ["A2", "L31"], ["F2", "L32"], ["D2", "L33"], ["TB2", "L34"], ["TG2", "L35"], ["L36"]
+    ],
+    "TUE": [
+        ["B1", "L7"], ["G1", "L8"], ["E1", "L9"], ["TC1", "L10"], ["TAA1", "L11"], ["L12"], [""],
+        ["B2", "L37"], ["G2", "L38"], ["E2", "L39"], ["TC2", "L40"], ["TAA2", "L41"], ["L42"]
+    ],
+    "WED": [
+        ["C1", "L13"], ["A1", "L14"], ["F1", "L15"], ["V1", "L16"], ["V2", "L17"], ["L18"], [""],
+        ["C2", "L43"], ["A2", "L44"], ["F2", "L45"], ["TD2", "L46"], ["TBB2", "L47"], ["L48"]
+    ],
+    "THU": [
+        ["D1", "L19"], ["B1", "L20"], ["G1", "L21"], ["TE1", "L22"], ["TCC1", "L23"], ["L24"], [""],
+        ["D2", "L49"], ["B2", "L50"], ["G2", "L51"], ["TE2", "L52"], ["TCC2", "L53"], ["L54"]
+    ],
+    "FRI": [
+        ["E1", "L25"], ["C1", "L26"], ["TA1", "L27"], ["TF1", "L28"], ["TD1", "L29"], ["L30"], [""],
+        ["E2", "L55"], ["C2", "L56"], ["TA2", "L57"], ["TF2", "L58"], ["TDD2", "L59"], ["L60"]
+    ]
+}
+# Theory and lab time labels (for header)
+theory_times = [
+    "8:00 AM to 8:50 AM", "9:00 AM to 9:50 AM", "10:00 AM to 10:50 AM", "11:00 AM to 11:50 AM", "12:00 PM to 12:50 PM", "-", "-", "2:00 PM to 2:50 PM", "3:00 PM to 3:50 PM", "4:00 PM to 4:50 PM", "5:00 PM to 5:50 PM", "6:00 PM to 6:50 PM", "6:51 PM to 7:00 PM"
+]
+lab_times = [
+    "8:00 AM to 8:50 AM", "8:51 AM to 9:40 AM", "9:50 AM to 10:40 AM","10:41 AM to 11:30 AM","11:40 AM to 12:30 PM","12:30 PM to 1:20 PM", "-", "2:00 PM to 2:50 PM", "2:51 PM to 3:40 PM", "3:51 PM to 4:40 PM", "4:41 PM to 5:30 PM", "5:40 PM to 6:30 PM", "6:30 PM to 7:20 PM",
+]
+
+# --- Build slot-to-cell mapping and slot-to-time mapping ---
+slot_to_cells = {}
+cell_to_slots = {}  # (day, period) -> [slot, ...]
+slot_time_map = {}
+for day in days:
+    for period, slots in enumerate(timetableData[day]):
+        cell_to_slots[(day, period)] = slots
+        for slot in slots:
+            if slot:
+                slot_to_cells.setdefault(slot, []).append((day, period))
+                # Map time for both theory and lab slots
+                if not slot.startswith("L"):
+                    # Theory slot
+                    if period < len(theory_times) and theory_times[period] != "-":
+                        start, end = theory_times[period].split(" to ") if "to" in theory_times[period] else (theory_times[period], theory_times[period])
+                        slot_time_map[(day, slot)] = time_range_to_tuple(start, end)
+                else:
+                    # Lab slot
+                    if period < len(lab_times) and lab_times[period] != "-":
+                        start, end = lab_times[period].split(" to ") if "to" in lab_times[period] else (lab_times[period], lab_times[period])
+                        slot_time_map[(day, slot)] = time_range_to_tuple(start, end)
+
+# --- Bitmask clash engine ---
+# Every slot gets a week-wide bitmask with one bit per minute it occupies
+# (day d, minute m -> bit d * 1440 + m) plus a mask of the grid cells it fills.
+# Two slots clash when either mask overlaps, so checks are a few ANDs.
+MINUTES_PER_DAY = 24 * 60
+DAY_MASK = (1 << MINUTES_PER_DAY) - 1
+
+
+def range_mask(day_index, start, end):
+    if start is None or end is None or end <= start:
+        return 0
+    return ((1 << (end - start)) - 1) << (day_index * MINUTES_PER_DAY + start)
+
+
+def parse_slots(slot_str):
+    return [s.strip().upper() for s in re.split(r'\+|,|\s+', slot_str) if s.strip()]
+
+
+class ClashEngine:
+    def __init__(self):
+        self.cell_bit = {}
+        for day in days:
+            for period in range(len(timetableData[day])):
+                self.cell_bit[(day, period)] = 1 << len(self.cell_bit)
+        self.time_masks = {}
+        self.cell_masks = {}
+        for slot, cells in slot_to_cells.items():
+            time_mask = cell_mask = 0
+            for day, period in cells:
+                start, end = slot_time_map.get((day, slot), (None, None))
+                time_mask |= range_mask(days.index(day), start, end)
+                cell_mask |= self.cell_bit[(day, period)]
+            self.time_masks[slot] = time_mask
+            self.cell_masks[slot] = cell_mask
+
+    def overlap_days(self, time_mask, cell_mask=0):
+        found = []
+        for i, day in enumerate(days):
+            if (time_mask >> (i * MINUTES_PER_DAY)) & DAY_MASK:
+                found.append(day)
+            elif any(cell_mask & self.cell_bit[(day, p)] for p in range(len(timetableData[day]))):
+                found.append(day)
+        return found
+
+    def slots_mask(self, slots):
+        time_mask = cell_mask = 0
+        for slot in slots:
+            time_mask |= self.time_masks.get(slot, 0)
+            cell_mask |= self.cell_masks.get(slot, 0)
+        return time_mask, cell_mask
+
+    def check(self, slots, state=None):
+        # Returns every problem with adding slots to state: [(slot, other, days)],
+        # where other is None for an unknown slot. Empty list means no clash.
+        problems = [(slot, None, []) for slot in slots if slot not in self.time_masks]
+        known = [slot for slot in dict.fromkeys(slots) if slot in self.time_masks]
+        for i, slot in enumerate(known):
+            for other in known[i + 1:]:
+                time_overlap = self.time_masks[slot] & self.time_masks[other]
+                cell_overlap = self.cell_masks[slot] & self.cell_masks[other]
+                if time_overlap or cell_overlap:
+                    problems.append((slot, other, self.overlap_days(time_overlap, cell_overlap)))
+        if state is None:
+            return problems
+        time_mask, cell_mask = self.slots_mask(known)
+        if not (time_mask & state.time_mask or cell_mask & state.cell_mask):
+            return problems
+        for slot in known:
+            if not (self.time_masks[slot] & state.time_mask or self.cell_masks[slot] & state.cell_mask):
+                continue
+            for other in state.slots:
+                time_overlap = self.time_masks[slot] & self.time_masks[other]
+                cell_overlap = self.cell_masks[slot] & self.cell_masks[other]
+                if time_overlap or cell_overlap:
+                    problems.append((slot, other, self.overlap_days(time_overlap, cell_overlap)))
+        return problems
+
+    def add(self, state, slots, owner):
+        time_mask, cell_mask = self.slots_mask(slots)
+        state.time_mask |= time_mask
+        state.cell_mask |= cell_mask
+        for slot in slots:
+            state.slots[slot] = owner
+
+    def remove(self, state, owner):
+        for slot in [slot for slot, o in state.slots.items() if o == owner]:
+            del state.slots[slot]
+        state.time_mask, state.cell_mask = self.slots_mask(state.slots)
+
+    def cells(self, slots):
+        return [cell for slot in slots for cell in slot_to_cells.get(slot, [])]
+
+    def cell_kinds(self, slots):
+        # cell -> True when a lab slot fills it (drawn red), False for theory (green)
+        kinds = {}
+        for slot in slots:
+            for cell in slot_to_cells.get(slot, []):
+                kinds[cell] = kinds.get(cell, False) or slot.startswith("L")
+        return kinds
+
+
+# Occupied minutes/cells of a timetable, in the same bitmask form as ClashEngine
+class SlotState:
+    def __init__(self):
+        self.time_mask = 0
+        self.cell_mask = 0
+        self.slots = {}  # slot -> owner (e.g. the faculty_list index)
+
+
+def describe_problems(problems):
+    messages = []
+    for slot, other, clash_days in problems:
+        if other is None:
+            messages.append(f"Invalid slot: {slot}.")
+        else:
+            messages.append(f"Timing clash: {slot} overlaps with {other} on {', '.join(clash_days)}.")
+    return messages
+
+
+clash_engine = ClashEngine()
+
+
+# --- Timetable HTML ---
+# The header never changes and each cell's markup depends only on its position
+# and what occupies it, so both are built once and reused across reruns and
+# sessions; a whole table is memoized on the occupied cells.
+def _build_header_html():
+    header = '<tr><th class="period-label" rowspan="2">DAY</th>'
+    header += "".join(f'<th class="theory-time">{t}</th>' for t in theory_times)
+    header += '</tr><tr>'
+    header += "".join(f'<th class="lab-time">{t}</th>' for t in lab_times)
+    return header + '</tr>'
+
+
+HEADER_HTML = _build_header_html()
+
+
+@lru_cache(maxsize=4096)
+def cell_html(day, period, course_code=None, room=None, is_lab=False):
+    slots = timetableData[day][period] if period < len(timetableData[day]) else []
+    slot_label = " / ".join([s for s in slots if s])
+    if not slot_label:
+        return '<td class="lunch">LUNCH</td>'
+    if course_code is None:
+        return f'<td class="empty">{slot_label}</td>'
+    cell_class = "red" if is_lab else "green"
+    # Only show course code and room number
+    return f'<td class="{cell_class}">{slot_label}<br>{html.escape(course_code)}<br>{html.escape(room)}</td>'
+
+
+@lru_cache(maxsize=256)
+def _table_html(occupied):
+    occupied = {cell: rest for cell, *rest in occupied}
+    rows = []
+    for day in days:
+        cells = "".join(cell_html(day, period, *occupied.get((day, period), ())) for period in range(len(theory_times)))
+        rows.append(f'<tr><td class="period-label">{day}</td>{cells}</tr>')
+    return f'<table class="ffcs-table">{HEADER_HTML}{"".join(rows)}</table>'
+
+
+def render_timetable_html(timetable, cell_is_lab):
+    # timetable: (day, period) -> entry or None; cell_is_lab: (day, period) -> bool
+    occupied = tuple(
+        (cell, entry["course_code"], entry["room"], cell_is_lab.get(cell, False))
+        for cell, entry in timetable.items() if entry
+    )
+    return _table_html(occupied)